@@ -1,12 +1,15 @@
 """Backtest and BacktestAnalysis Class"""
 
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
 import numpy as np
 import pandas as pd
+from checkpoint import load_checkpoint, save_checkpoint
+from costs import CostModel, cost_sensitivity
 from portfolio import Portfolio
+from rendering import draw_nav, draw_underwater, draw_volatility
+from resampling import confidence_intervals, resample_metrics
 from strategy import Strategy
 
 
@@ -37,20 +40,149 @@ class Backtest:
         self.price_data_source = price_data_source
         self._NAV_record = dict()
         self._backtest_run = False
+        # Index of the next timestamp to run
+        self._position = 0
 
-    def run_backtest(self) -> None:
-        """Run the backtest."""
-        for ts in self.timestamps:
+    def run_backtest(
+        self,
+        checkpoint_filepath: Optional[str] = None,
+        checkpoint_every: int = 250,
+    ) -> None:
+        """
+        Run the backtest (or the rest of it after load_checkpoint).
+
+        Args:
+            checkpoint_filepath: Filepath to save checkpoints to. Defaults to
+            None (no checkpoints).
+            checkpoint_every: Number of timestamps between checkpoints.
+            Defaults to 250.
+        """
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1.")
+
+        while self._position < len(self.timestamps):
+            ts = self.timestamps[self._position]
             # Get prices for ts
             prices = self.price_data_source.loc[ts]
-            # Get target weights (pass only new prices to strategy to avoid
-            # look-ahead bias)
-            target_weights = self.strategy(ts=ts, prices=prices)
-            # Rebalance portfolio
-            self.portfolio.rebalance(weights=target_weights, ts=ts)
-            # Record NAV
-            self._NAV_record[ts] = self.portfolio.NAV
-            self._backtest_run = True
+            self._step(ts=ts, prices=prices)
+
+            if (
+                checkpoint_filepath is not None
+                and self._position % checkpoint_every == 0
+            ):
+                self.save_checkpoint(checkpoint_filepath)
+
+        if checkpoint_filepath is not None:
+            self.save_checkpoint(checkpoint_filepath)
+
+    def extend(
+        self,
+        prices_df: pd.DataFrame,
+        weights_df: Optional[pd.DataFrame] = None,
+    ) -> None:
+        """
+        Continue a finished backtest over new timestamps, e.g. to add the
+        latest day without rerunning the history. Only the new rows are used,
+        so the cost depends on the number of new timestamps.
+
+        NOTE: The new prices are passed to the portfolio directly, they are not
+        added to price_data_source (of the backtest or the portfolio), so new
+        timestamps cannot be looked up there.
+
+        Args:
+            prices_df: Dataframe of prices for the new timestamps. May be
+            empty, e.g. on a day without a new bar.
+            weights_df: Dataframe of new weights for the strategy. Defaults to
+            None (no new weights).
+        """
+        if not self._backtest_run or self._position < len(self.timestamps):
+            raise ValueError("Please run backtest first.")
+        if not prices_df.empty:
+            if not (
+                prices_df.index.is_monotonic_increasing
+                and prices_df.index.is_unique
+            ):
+                raise ValueError("New timestamps must be sorted and unique.")
+            if prices_df.index[0] <= self.timestamps[-1]:
+                raise ValueError("New prices must be after the last timestamp.")
+
+        # New weights are kept even without new prices.
+        if weights_df is not None:
+            self.strategy.add_weights(weights_df)
+
+        # NOTE: Timestamps are kept as a list so appending is cheap.
+        if not isinstance(self.timestamps, list):
+            self.timestamps = list(self.timestamps)
+        for ts in prices_df.index.values:
+            self.timestamps.append(ts)
+            self._step(ts=ts, prices=prices_df.loc[ts])
+
+    def save_checkpoint(self, filepath: str) -> None:
+        """
+        Save the state of the backtest, portfolio and strategy.
+
+        Args:
+            filepath: Filepath to checkpoint file.
+        """
+        save_checkpoint(
+            filepath,
+            {
+                "position": self._position,
+                "last_timestamp": (
+                    self.timestamps[self._position - 1]
+                    if self._position
+                    else None
+                ),
+                "NAV_record": self._NAV_record,
+                "backtest_run": self._backtest_run,
+                "portfolio": self.portfolio.get_state(),
+                "strategy": self.strategy.get_state(),
+            },
+        )
+
+    def load_checkpoint(self, filepath: str) -> None:
+        """
+        Restore the state saved by save_checkpoint. The backtest must be set up
+        with the same strategy, portfolio and timestamps as the saved one;
+        run_backtest() then continues from the checkpoint.
+
+        Args:
+            filepath: Filepath to checkpoint file.
+        """
+        state = load_checkpoint(filepath)
+        position = state["position"]
+        if position > len(self.timestamps) or (
+            position
+            and self.timestamps[position - 1] != state["last_timestamp"]
+        ):
+            raise ValueError(
+                "Checkpoint does not match the timestamps of this backtest."
+            )
+        self._position = position
+        self._NAV_record = state["NAV_record"]
+        self._backtest_run = state["backtest_run"]
+        self.portfolio.set_state(state["portfolio"])
+        self.strategy.set_state(state["strategy"])
+
+    def _step(self, ts: pd.Timestamp, prices: pd.Series) -> None:
+        """
+        Run the backtest for one timestamp.
+
+        Args:
+            ts: Timestamp.
+            prices: Prices for each asset on ts.
+        """
+        # Get target weights (pass only new prices to strategy to avoid
+        # look-ahead bias)
+        target_weights = self.strategy(ts=ts, prices=prices)
+        # Rebalance portfolio
+        self.portfolio.rebalance(
+            weights=target_weights, ts=ts, prices=prices.to_dict()
+        )
+        # Record NAV
+        self._NAV_record[ts] = self.portfolio.NAV
+        self._backtest_run = True
+        self._position += 1
 
     @property
     def NAV_record(self) -> dict:
@@ -88,6 +220,9 @@ class BacktestAnalysis:
         self._max_daily_drawdown = pd.Series()
         self._drawdown_duration_max = int()
         self._compute_stats = False
+        # Running statistics and new time series rows for update()
+        self._running = dict()
+        self._pending_stats = []
 
     def compute_stats(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Compute backtest statistics."""
@@ -103,6 +238,85 @@ class BacktestAnalysis:
             columns=["Volatility", "Max Drawdown", "Sharpe Ratio"]
         )
         self._summary_stats = self._summary_stats.drop(columns=[0])
+        self._init_running_stats()
+
+    def update(self) -> None:
+        """
+        Update the statistics with the NAVs added to the backtest (see
+        Backtest.extend) since compute_stats() or the last update().
+
+        Only the new NAVs are processed: the summary statistics are updated
+        from running totals and the new time series rows are appended to the
+        stats dataframe when it is next used.
+        """
+        if not self._compute_stats:
+            raise ValueError("Please run compute_stats() first.")
+        running = self._running
+        new_timestamps = self.backtest.timestamps[running["n"] :]
+        if len(new_timestamps) == 0:
+            return
+
+        index = pd.DatetimeIndex(new_timestamps)
+        NAV = np.array([self._NAV_record[ts] for ts in new_timestamps])
+
+        # Returns
+        previous_NAV = np.r_[running["last_NAV"], NAV[:-1]]
+        returns = NAV / previous_NAV - 1
+        cumulative_returns = (1 + running["cumulative_return"]) * np.cumprod(
+            1 + returns
+        ) - 1
+
+        # Mean and variance of returns (merge of running and new moments)
+        n_returns = running["n"] - 1
+        n_new = len(returns)
+        new_mean = returns.mean()
+        delta = new_mean - running["mean_return"]
+        running["M2"] += ((returns - new_mean) ** 2).sum() + delta**2 * (
+            n_returns * n_new / (n_returns + n_new)
+        )
+        running["mean_return"] += delta * n_new / (n_returns + n_new)
+
+        # Drawdowns
+        peak_NAV = np.maximum.accumulate(np.r_[running["peak_NAV"], NAV])[1:]
+        daily_drawdown = NAV / peak_NAV - 1
+        max_daily_drawdown = np.minimum.accumulate(
+            np.r_[running["max_drawdown"], daily_drawdown]
+        )[1:]
+        if daily_drawdown.min() < running["max_drawdown"]:
+            running["max_drawdown"] = daily_drawdown.min()
+            running["max_drawdown_date"] = index[daily_drawdown.argmin()]
+        peak_dates = index[daily_drawdown == 0]
+        if len(peak_dates):
+            peak_durations = np.diff(
+                peak_dates.insert(0, running["last_peak_date"])
+            ).astype("timedelta64[D]")
+            running["drawdown_duration_max"] = max(
+                running["drawdown_duration_max"],
+                peak_durations.max().astype(int),
+            )
+            running["last_peak_date"] = peak_dates[-1]
+
+        running["n"] += n_new
+        running["last_NAV"] = NAV[-1]
+        running["peak_NAV"] = peak_NAV[-1]
+        running["cumulative_return"] = cumulative_returns[-1]
+        running["last_date"] = index[-1]
+
+        self._pending_stats.append(
+            (
+                pd.DataFrame(
+                    {
+                        "NAV": NAV,
+                        "Returns": returns,
+                        "Cumulative Returns": cumulative_returns,
+                    },
+                    index=index,
+                ),
+                pd.Series(daily_drawdown, index=index),
+                pd.Series(max_daily_drawdown, index=index),
+            )
+        )
+        self._update_summary_stats()
 
     def output_to_excel(self, filepath: str) -> None:
         """
@@ -113,6 +327,7 @@ class BacktestAnalysis:
         """
         if not self._compute_stats:
             raise ValueError("Please run compute_stats() first.")
+        self._consolidate_stats()
 
         writer = pd.ExcelWriter(filepath, engine="xlsxwriter")
 
@@ -126,6 +341,8 @@ class BacktestAnalysis:
         writer.sheets["Summary"].set_column(4, 5, 20)
         writer.sheets["Summary"].set_column(6, 7, 20, percent_format)
         writer.sheets["Summary"].set_column(8, 9, 30)
+        # Cost Model (only with a cost model)
+        writer.sheets["Summary"].set_column(10, 10, 60)
 
         writer.close()
 
@@ -134,6 +351,7 @@ class BacktestAnalysis:
         """Return the stats dataframe."""
         if not self._compute_stats:
             raise ValueError("Please run compute_stats() first.")
+        self._consolidate_stats()
         return self._stats
 
     @property
@@ -143,92 +361,346 @@ class BacktestAnalysis:
             raise ValueError("Please run compute_stats() first.")
         return self._summary_stats
 
-    def plot(self, save: bool = False) -> None:
+    def trading_stats(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Compute turnover, transaction cost and exposure statistics from the
+        portfolio trade and holdings ledgers.
+
+        Returns:
+            Tuple of time series dataframe and summary dataframe.
+        """
+        portfolio = self.backtest.portfolio
+        NAV = pd.Series(self._NAV_record)
+        index = pd.DatetimeIndex(NAV.index)
+        NAV = NAV.to_numpy()
+
+        # Aggregate ledger rows by timestamp
+        trades = portfolio.trade_ledger
+        trade_ts = index.searchsorted(trades.column("timestamp"))
+        traded_value = np.bincount(
+            trade_ts,
+            weights=np.abs(trades.column("quantity") * trades.column("price")),
+            minlength=len(index),
+        )
+        # NOTE: Initial positions are not counted as turnover (see Portfolio).
+        traded_value[0] = 0
+        costs = np.bincount(
+            trade_ts, weights=trades.column("cost"), minlength=len(index)
+        )
+        holdings = portfolio.holdings_ledger
+        holding_ts = index.searchsorted(holdings.column("timestamp"))
+        holding_value = holdings.column("quantity") * holdings.column("price")
+        gross_exposure = np.bincount(
+            holding_ts, weights=np.abs(holding_value), minlength=len(index)
+        )
+        net_exposure = np.bincount(
+            holding_ts, weights=holding_value, minlength=len(index)
+        )
+
+        trading_stats = pd.DataFrame(
+            {
+                "Traded Value": traded_value,
+                "Turnover": traded_value / NAV,
+                "Transaction Cost": costs,
+                "Cost Drag": costs / NAV,
+                "Gross Exposure": gross_exposure / NAV,
+                "Net Exposure": net_exposure / NAV,
+            },
+            index=index,
+        )
+        # Annualise over the number of returns, as in _construct_summary_stats
+        annualisation = 252 / (len(index) - 1)
+        trading_summary_stats = pd.DataFrame(
+            {
+                "Turnover (Ann.)": [
+                    trading_stats["Turnover"].sum() * annualisation
+                ],
+                "Total Transaction Cost": [costs.sum()],
+                "Cost Drag (Ann.)": [
+                    trading_stats["Cost Drag"].sum() * annualisation
+                ],
+                "Gross Exposure (Mean)": [
+                    trading_stats["Gross Exposure"].mean()
+                ],
+                "Net Exposure (Mean)": [trading_stats["Net Exposure"].mean()],
+            }
+        )
+
+        return trading_stats, trading_summary_stats
+
+    def robustness(
+        self,
+        n_paths: int = 10000,
+        method: str = "block",
+        block_length: int = 21,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+        n_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Confidence intervals of the backtest statistics from resampled return
+        paths (see resampling.py).
+
+        Args:
+            n_paths: Number of resampled paths. Defaults to 10000.
+            method: "block" (block bootstrap) or "monte_carlo". Defaults to
+            "block".
+            block_length: Block length for the block bootstrap. Defaults to 21.
+            confidence: Confidence level. Defaults to 0.95.
+            seed: Random seed. Defaults to None.
+            n_workers: Number of worker processes for large n_paths. Defaults
+            to None (run in this process).
+
+        Returns:
+            Dataframe with the backtest value, resampled mean and confidence
+            interval of each statistic.
+        """
+        if not self._compute_stats:
+            raise ValueError("Please run compute_stats() first.")
+        self._consolidate_stats()
+        # Ignore first value which is not physical
+        returns = self._stats["Returns"].to_numpy()[1:]
+        metrics = resample_metrics(
+            returns,
+            n_paths=n_paths,
+            method=method,
+            block_length=block_length,
+            risk_free_rate=self.risk_free_rate,
+            seed=seed,
+            n_workers=n_workers,
+        )
+        intervals = confidence_intervals(metrics, confidence=confidence)
+        intervals.insert(
+            0, "Backtest", self._summary_stats[intervals.index].iloc[0]
+        )
+        return intervals
+
+    def cost_sensitivity(
+        self, cost_models: Dict[str, CostModel]
+    ) -> pd.DataFrame:
+        """
+        Evaluate alternative transaction cost scenarios over the trades of the
+        backtest without rerunning it.
+
+        Args:
+            cost_models: Dictionary of cost model for each scenario name.
+
+        Returns:
+            Dataframe of cost statistics, one row per scenario.
+        """
+        self._consolidate_stats()
+        ledger = self.backtest.portfolio.trade_ledger
+        timestamps = ledger.column("timestamp")
+        # NOTE: No transaction cost for initial positions (see Portfolio), and
+        # costs paid on the last timestamp are after the last NAV.
+        trades = (timestamps > self._stats.index[0]) & (
+            timestamps < self._stats.index[-1]
+        )
+        return cost_sensitivity(
+            cost_models=cost_models,
+            quantities=ledger.column("quantity")[trades],
+            prices=ledger.column("price")[trades],
+            tickers=np.array(ledger.assets)[ledger.column("asset")[trades]],
+            NAV=self._stats["NAV"],
+            charged_costs=ledger.column("cost")[trades],
+        )
+
+    def plot(
+        self,
+        save: bool = False,
+        filepath: str = "output/nav.png",
+        show: bool = True,
+        dpi: int = 500,
+        max_points: Optional[int] = None,
+    ) -> None:
         """
         Plot the NAV record.
 
         Args:
             save: Boolean to save plot. Defaults to False.
+            filepath: Filepath to save plot to. Defaults to "output/nav.png".
+            show: Boolean to show plot. Defaults to True.
+            dpi: Resolution of saved plot. Defaults to 500.
+            max_points: Maximum number of points to draw (see
+            rendering.decimate_minmax). Defaults to None (all).
         """
-        plt.figure()
-        normalised_NAV_record = [
-            NAV / self.backtest.portfolio.get_initial_capital
-            for NAV in self._NAV_record.values()
-        ]
-        plt.plot(self._NAV_record.keys(), normalised_NAV_record)
-        plt.title(
-            "NAV - Daily Rebalancing -"
-            f" {self.backtest.portfolio.transaction_cost * 100}%"
-            " Transaction Cost"
-        )
-        plt.ylabel("NAV / Initial Capital")
-        plt.xlabel("Date")
-        if save:
-            plt.savefig("output/nav.png", dpi=500)
-        plt.show()
+        fig, ax = plt.subplots()
+        normalised_NAV_record = pd.Series(self._NAV_record) / (
+            self.backtest.portfolio.get_initial_capital
+        )
+        portfolio = self.backtest.portfolio
+        draw_nav(
+            ax,
+            normalised_NAV_record,
+            # The title only shows a flat transaction cost.
+            transaction_cost=(
+                portfolio.transaction_cost
+                if portfolio.cost_model is None
+                else None
+            ),
+            max_points=max_points,
+        )
+        self._finish_plot(fig, save, filepath, show, dpi)
 
-    def underwater_plot(self, save: bool = False) -> None:
+    def underwater_plot(
+        self,
+        save: bool = False,
+        filepath: str = "output/underwater.png",
+        show: bool = True,
+        dpi: int = 500,
+        max_points: Optional[int] = None,
+    ) -> None:
         """
         Plot the drawdowns.
 
         Args:
             save: Boolean to save plot. Defaults to False.
+            filepath: Filepath to save plot to. Defaults to
+            "output/underwater.png".
+            show: Boolean to show plot. Defaults to True.
+            dpi: Resolution of saved plot. Defaults to 500.
+            max_points: Maximum number of points to draw (see
+            rendering.decimate_minmax). Defaults to None (all).
         """
         if not self._compute_stats:
             raise ValueError("Please run compute_stats() first.")
+        self._consolidate_stats()
         fig, ax = plt.subplots()
-        ax.plot(
-            self._daily_drawdown.index,
-            self._daily_drawdown * 100,
-            label="Daily Drawdown",
-        )
-        ax.plot(
-            self._max_daily_drawdown.index,
-            self._max_daily_drawdown * 100,
-            label="Max Daily Drawdown",
-        )
-        ax.set_title("Underwater Chart")
-        ax.set_ylabel("Drawdown")
-        ax.set_xlabel("Date")
-        ax.yaxis.set_major_formatter(mtick.PercentFormatter(decimals=1))
-        ax.legend()
-        if save:
-            plt.savefig("output/underwater.png", dpi=500)
-        plt.show()
+        draw_underwater(
+            ax,
+            self._daily_drawdown,
+            self._max_daily_drawdown,
+            max_points=max_points,
+        )
+        self._finish_plot(fig, save, filepath, show, dpi)
 
-    def volatility_plot(self, save: bool = False) -> None:
+    def volatility_plot(
+        self,
+        save: bool = False,
+        filepath: str = "output/volatility.png",
+        show: bool = True,
+        dpi: int = 500,
+        max_points: Optional[int] = None,
+    ) -> None:
         """
         Plot the volatility.
 
         Args:
             save: Boolean to save plot. Defaults to False.
+            filepath: Filepath to save plot to. Defaults to
+            "output/volatility.png".
+            show: Boolean to show plot. Defaults to True.
+            dpi: Resolution of saved plot. Defaults to 500.
+            max_points: Maximum number of points to draw (see
+            rendering.decimate_minmax). Defaults to None (all).
         """
-        rolling_volatility = self._rolling_volatility()
         if not self._compute_stats:
             raise ValueError("Please run compute_stats() first.")
+        rolling_volatility = self._rolling_volatility()
         fig, ax = plt.subplots()
-        ax.plot(
-            rolling_volatility.index,
-            rolling_volatility * 100,
-            label="Rolling 21 day Volatility",
-        )
-        average_value = rolling_volatility.mean() * 100
-        ax.axhline(
-            y=average_value, color="black", linestyle="dashed", label="Average"
-        )
-        ax.set_title("Volatility (Ann.)")
-        ax.set_xlabel("Date")
-        ax.legend()
-        ax.yaxis.set_major_formatter(mtick.PercentFormatter(decimals=1))
+        draw_volatility(ax, rolling_volatility, max_points=max_points)
+        self._finish_plot(fig, save, filepath, show, dpi)
+
+    @staticmethod
+    def _finish_plot(
+        fig: plt.Figure, save: bool, filepath: str, show: bool, dpi: int
+    ) -> None:
+        """Save and show (or close) a plot."""
         if save:
-            plt.savefig("output/volatility.png", dpi=500)
-        plt.show()
+            fig.savefig(filepath, dpi=dpi)
+        if show:
+            plt.show()
+        else:
+            # Free the figure (e.g. when called many times in a headless run)
+            plt.close(fig)
+
+    def _init_running_stats(self) -> None:
+        """Set up the running statistics used by update()."""
+        NAV = self._stats["NAV"].to_numpy()
+        returns = self._stats["Returns"].to_numpy()[1:]
+        mean_return = returns.mean() if len(returns) else 0
+        peak_dates = self._daily_drawdown.index[self._daily_drawdown == 0]
+        peak_durations = np.diff(peak_dates).astype("timedelta64[D]")
+        self._running = {
+            "n": len(NAV),
+            "last_NAV": NAV[-1],
+            "peak_NAV": NAV.max(),
+            "cumulative_return": self._stats["Cumulative Returns"].iloc[-1],
+            "mean_return": mean_return,
+            "M2": ((returns - mean_return) ** 2).sum(),
+            "max_drawdown": self._max_daily_drawdown.iloc[-1],
+            "max_drawdown_date": self._max_daily_drawdown.idxmin(),
+            "last_peak_date": peak_dates[-1],
+            "drawdown_duration_max": (
+                peak_durations.max().astype(int) if len(peak_durations) else 0
+            ),
+            "last_date": self._stats.index[-1],
+        }
+
+    def _update_summary_stats(self) -> None:
+        """Update summary statistics from the running statistics."""
+        running = self._running
+        n = running["n"]
+        volatility = np.sqrt(running["M2"] / (n - 2)) * np.sqrt(n - 1)
+        sharpe_ratio = (
+            (n - 1)
+            * (running["mean_return"] - self.risk_free_rate / 252)
+            / volatility
+        )
+        first_NAV = self._stats["NAV"].iloc[0]
+
+        self._summary_stats["Total Return"] = (
+            running["last_NAV"] / first_NAV - 1
+        )
+        self._summary_stats["Return (Ann.)"] = (
+            1 + self._summary_stats["Total Return"]
+        ) ** (252 / n) - 1
+        self._summary_stats["Sharpe Ratio"] = sharpe_ratio
+        self._summary_stats["Sharpe Ratio (Ann.)"] = (
+            np.sqrt(252 / (n - 1)) * sharpe_ratio
+        )
+        self._summary_stats["Volatility (Ann.)"] = volatility * np.sqrt(
+            252 / (n - 1)
+        )
+        self._summary_stats["Max Drawdown"] = abs(running["max_drawdown"])
+        self._summary_stats["Max Drawdown Date"] = running[
+            "max_drawdown_date"
+        ].strftime("%Y-%m-%d")
+        # Float, as computed by _compute_longest_drawdown
+        self._drawdown_duration_max = float(
+            max(
+                running["drawdown_duration_max"],
+                (running["last_date"] - running["last_peak_date"]).days,
+            )
+        )
+        self._summary_stats[
+            "Longest Drawdown (Days)"
+        ] = self._drawdown_duration_max
+
+    def _consolidate_stats(self) -> None:
+        """Append time series rows computed by update() to the stats."""
+        if not self._pending_stats:
+            return
+        stats, daily_drawdown, max_daily_drawdown = zip(*self._pending_stats)
+        self._stats = pd.concat([self._stats, *stats])
+        self._daily_drawdown = pd.concat(
+            [self._daily_drawdown, *daily_drawdown]
+        )
+        self._max_daily_drawdown = pd.concat(
+            [self._max_daily_drawdown, *max_daily_drawdown]
+        )
+        self._pending_stats = []
 
     def _construct_summary_stats(self) -> None:
         """Construct dataframe of summary statistics for entire backtest."""
-        self._summary_stats[
-            "Transaction Cost"
-        ] = self.backtest.portfolio.transaction_cost
+        # NOTE: A cost model has no single rate, so it is described in a
+        # "Cost Model" column (added last) instead.
+        portfolio = self.backtest.portfolio
+        self._summary_stats["Transaction Cost"] = (
+            portfolio.transaction_cost
+            if portfolio.cost_model is None
+            else np.nan
+        )
         self._summary_stats["Risk Free Rate"] = self.risk_free_rate
         self._summary_stats["Total Return"] = (
             self._stats["NAV"].iloc[-1] / self._stats["NAV"].iloc[0] - 1
@@ -253,6 +725,8 @@ class BacktestAnalysis:
         self._summary_stats[
             "Longest Drawdown (Days)"
         ] = self._drawdown_duration_max
+        if portfolio.cost_model is not None:
+            self._summary_stats["Cost Model"] = repr(portfolio.cost_model)
 
     def _compute_returns(self) -> None:
         """Compute (cumulative) returns."""
@@ -271,6 +745,7 @@ class BacktestAnalysis:
 
     def _rolling_volatility(self) -> pd.Series:
         """Compute rolling 21 day volatility."""
+        self._consolidate_stats()
         rolling_volatility = self._stats["Returns"][1:].rolling(
             21
         ).std() * np.sqrt(252)
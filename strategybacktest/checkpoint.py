@@ -0,0 +1,60 @@
+"""Checkpoint files for backtest state."""
+
+import os
+import pickle
+import zlib
+from typing import Any, Dict
+
+# NOTE: Checkpoints are zlib compressed pickles behind a short header. Pickle
+# keeps floats, numpy arrays and dataframes exact, so a resumed backtest gives
+# an identical result. Only load checkpoints you have written yourself.
+_MAGIC = b"SBCKPT"
+_VERSION = 1
+
+
+def save_checkpoint(filepath: str, state: Dict[str, Any]) -> None:
+    """
+    Save state to a checkpoint file.
+
+    The file is written next to the destination and then renamed, so an
+    existing checkpoint is never left half written if the run dies.
+
+    Args:
+        filepath: Filepath to checkpoint file.
+        state: Dictionary of state to save.
+    """
+    payload = zlib.compress(
+        pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    )
+    tmp_filepath = f"{filepath}.tmp"
+    with open(tmp_filepath, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_VERSION.to_bytes(2, "little"))
+        f.write(payload)
+    os.replace(tmp_filepath, filepath)
+
+
+def load_checkpoint(filepath: str) -> Dict[str, Any]:
+    """
+    Load state from a checkpoint file.
+
+    Args:
+        filepath: Filepath to checkpoint file.
+
+    Returns:
+        Dictionary of saved state.
+    """
+    with open(filepath, "rb") as f:
+        magic = f.read(len(_MAGIC))
+        version = int.from_bytes(f.read(2), "little")
+        payload = f.read()
+
+    if magic != _MAGIC:
+        raise ValueError(f"{filepath} is not a backtest checkpoint.")
+    if version != _VERSION:
+        raise ValueError(
+            f"Checkpoint version {version} is not supported (expected"
+            f" {_VERSION})."
+        )
+
+    return pickle.loads(zlib.decompress(payload))
@@ -0,0 +1,267 @@
+"""Transaction cost models."""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# NOTE: Cost models work on arrays so the same model is used by the Portfolio
+# for single trades and by cost_sensitivity() for a whole trade list at once.
+# Costs are positive amounts of cash.
+
+
+class CostModel(ABC):
+    """Transaction cost model abstract class."""
+
+    @abstractmethod
+    def __call__(
+        self,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        tickers: List[str],
+    ) -> np.ndarray:
+        """
+        Compute transaction costs.
+
+        Args:
+            quantities: Trade quantities (signed number of shares).
+            prices: Trade prices, same shape as quantities.
+            tickers: Ticker of each entry along the last axis of quantities.
+
+        Returns:
+            Cost of each trade, same shape as quantities.
+        """
+        pass
+
+    def __add__(self, other: "CostModel") -> "CostModel":
+        return CompositeCost([self, other])
+
+    def __repr__(self) -> str:
+        parameters = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({parameters})"
+
+
+class FixedBpsCost(CostModel):
+    """
+    Cost proportional to traded value.
+
+    Args:
+        bps: Cost in basis points of traded value.
+    """
+
+    def __init__(self, bps: float) -> None:
+        self.bps = bps
+
+    def __call__(
+        self,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        tickers: List[str],
+    ) -> np.ndarray:
+        """Compute transaction costs."""
+        return np.abs(quantities * prices) * self.bps / 10000
+
+
+class PerAssetBpsCost(CostModel):
+    """
+    Cost proportional to traded value with a different rate for each asset.
+
+    Args:
+        bps: Dictionary of cost in basis points of traded value for each ticker.
+        default_bps: Cost for tickers missing from bps. Defaults to 0.
+    """
+
+    def __init__(self, bps: Dict[str, float], default_bps: float = 0) -> None:
+        self.bps = bps
+        self.default_bps = default_bps
+
+    def __call__(
+        self,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        tickers: List[str],
+    ) -> np.ndarray:
+        """Compute transaction costs."""
+        bps = _per_ticker(self.bps, tickers, default=self.default_bps)
+        return np.abs(quantities * prices) * bps / 10000
+
+
+class SpreadImpactCost(CostModel):
+    """
+    Half the bid-ask spread plus square-root market impact, i.e.
+    |value| * (spread / 2 + impact * volatility * sqrt(|quantity| / adv)).
+
+    Args:
+        spread_bps: Bid-ask spread in basis points.
+        volatility: Daily volatility of each ticker (or one for all).
+        adv: Average daily volume (shares) of each ticker (or one for all).
+        impact: Market impact coefficient. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        spread_bps: float,
+        volatility: Union[float, Dict[str, float]],
+        adv: Union[float, Dict[str, float]],
+        impact: float = 1,
+    ) -> None:
+        self.spread_bps = spread_bps
+        self.volatility = volatility
+        self.adv = adv
+        self.impact = impact
+
+    def __call__(
+        self,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        tickers: List[str],
+    ) -> np.ndarray:
+        """Compute transaction costs."""
+        volatility = _per_ticker(self.volatility, tickers)
+        adv = _per_ticker(self.adv, tickers)
+        abs_quantities = np.abs(quantities)
+        cost_rate = (
+            self.spread_bps / 20000
+            + self.impact * volatility * np.sqrt(abs_quantities / adv)
+        )
+        return abs_quantities * prices * cost_rate
+
+
+class MinimumFeeCost(CostModel):
+    """
+    Minimum ticket fee per (non-zero) trade on top of another cost model.
+
+    Args:
+        min_fee: Minimum cost of a trade.
+        cost_model: Cost model to apply the minimum to. Defaults to None (the
+        cost of every trade is min_fee).
+    """
+
+    def __init__(
+        self, min_fee: float, cost_model: Optional[CostModel] = None
+    ) -> None:
+        self.min_fee = min_fee
+        self.cost_model = cost_model
+
+    def __call__(
+        self,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        tickers: List[str],
+    ) -> np.ndarray:
+        """Compute transaction costs."""
+        if self.cost_model is None:
+            costs = np.zeros(np.shape(quantities))
+        else:
+            costs = self.cost_model(quantities, prices, tickers)
+        return np.where(quantities != 0, np.maximum(costs, self.min_fee), costs)
+
+
+class CompositeCost(CostModel):
+    """
+    Sum of cost models, e.g. FixedBpsCost(1) + SpreadImpactCost(...).
+
+    Args:
+        cost_models: Cost models to sum.
+    """
+
+    def __init__(self, cost_models: List[CostModel]) -> None:
+        self.cost_models = cost_models
+
+    def __call__(
+        self,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        tickers: List[str],
+    ) -> np.ndarray:
+        """Compute transaction costs."""
+        return sum(
+            cost_model(quantities, prices, tickers)
+            for cost_model in self.cost_models
+        )
+
+
+def _per_ticker(
+    value: Union[float, Dict[str, float]],
+    tickers: List[str],
+    default: Optional[float] = None,
+) -> Union[float, np.ndarray]:
+    """Return a parameter as an array over tickers (or a scalar)."""
+    if not isinstance(value, dict):
+        return value
+    # Look up each distinct ticker once, tickers can be a long trade list.
+    unique_tickers, inverse = np.unique(
+        np.asarray(tickers, dtype=str), return_inverse=True
+    )
+    if default is None:
+        unique_values = [value[ticker] for ticker in unique_tickers]
+    else:
+        unique_values = [
+            value.get(ticker, default) for ticker in unique_tickers
+        ]
+    return np.array(unique_values, dtype=float)[inverse]
+
+
+def cost_sensitivity(
+    cost_models: Dict[str, CostModel],
+    quantities: np.ndarray,
+    prices: np.ndarray,
+    tickers: List[str],
+    NAV: pd.Series,
+    charged_costs: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Evaluate cost scenarios over the same trade list.
+
+    Each scenario is evaluated over the whole trade list in one vectorized
+    call, so no backtest rerun is needed. As in Portfolio, costs are paid from
+    cash, so a scenario changes the final NAV by the difference between its
+    costs and the costs charged in the run. The trade list is held fixed, i.e.
+    this is the first order effect of the costs on the NAV (a rerun would also
+    size later trades from the changed NAV). The scenario with the run's own
+    cost model reproduces the run.
+
+    Args:
+        cost_models: Dictionary of cost model for each scenario name.
+        quantities: Quantity of each trade.
+        prices: Price of each trade.
+        tickers: Ticker of each trade.
+        NAV: Time-series of NAV of the run. Only the costs of trades before
+        the last timestamp are reflected in it.
+        charged_costs: Cost charged in the run for each trade.
+
+    Returns:
+        Dataframe of cost statistics, one row per scenario.
+    """
+    quantities = np.asarray(quantities, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    traded_value = np.abs(quantities * prices).sum()
+
+    # Cost of each trade for each scenario (scenario x trade)
+    costs = np.stack(
+        [
+            np.broadcast_to(
+                cost_model(quantities, prices, tickers), quantities.shape
+            )
+            for cost_model in cost_models.values()
+        ]
+    )
+    total_cost = costs.reshape(len(cost_models), -1).sum(axis=1)
+    cost_free_NAV = NAV.iloc[-1] + np.sum(charged_costs)
+    total_return = (cost_free_NAV - total_cost) / NAV.iloc[0] - 1
+
+    return pd.DataFrame(
+        {
+            "Total Cost": total_cost,
+            "Cost (bps of Traded Value)": (
+                10000 * total_cost / traded_value
+                if traded_value
+                else np.zeros(len(total_cost))
+            ),
+            "Cost Drag": total_cost / NAV.iloc[0],
+            "Total Return": total_return,
+            "Return (Ann.)": (1 + total_return) ** (252 / len(NAV)) - 1,
+        },
+        index=pd.Index(list(cost_models), name="Scenario"),
+    )
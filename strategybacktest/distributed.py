@@ -0,0 +1,479 @@
+"""Distributed execution of backtest sweeps."""
+
+import ipaddress
+import multiprocessing as mp
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+import warnings
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from spec import BacktestSpec, run_spec
+
+# NOTE: Work-queue protocol.
+# The broker serves two queues over TCP. Tasks are dictionaries
+# {"task_id": int, "attempt": int, "spec": str (BacktestSpec JSON)} and a None
+# task tells a worker to stop. Workers report back on the results queue with
+# dictionaries {"task_id", "attempt", "worker", "status", ...} where status is
+# one of "started", "heartbeat" (sent periodically while the task runs), "done"
+# (with "summary" and "NAV") or "failed" (with "error"). Everything sent is
+# plain python types, so workers on other hosts only need this package and the
+# input data.
+
+# Summary statistics which are spec parameters (transaction_cost and
+# risk_free_rate).
+SPEC_STATISTICS = ("Transaction Cost", "Risk Free Rate")
+
+_task_queue = queue.Queue()
+_result_queue = queue.Queue()
+
+
+def _get_task_queue() -> queue.Queue:
+    return _task_queue
+
+
+def _get_result_queue() -> queue.Queue:
+    return _result_queue
+
+
+class _BrokerManager(BaseManager):
+    """Manager serving the task and result queues."""
+
+
+_BrokerManager.register("get_task_queue", callable=_get_task_queue)
+_BrokerManager.register("get_result_queue", callable=_get_result_queue)
+
+
+class _WorkerManager(BaseManager):
+    """Manager used by workers to connect to a broker."""
+
+
+_WorkerManager.register("get_task_queue")
+_WorkerManager.register("get_result_queue")
+
+
+def _send_heartbeats(
+    results: queue.Queue,
+    message: Dict[str, Any],
+    interval: float,
+    stop: threading.Event,
+) -> None:
+    """Report that a task is still running every interval seconds."""
+    while not stop.wait(interval):
+        try:
+            results.put({**message, "status": "heartbeat"})
+        except (EOFError, ConnectionError):
+            return
+
+
+def sweep_worker(
+    address: Tuple[str, int], authkey: bytes, heartbeat_interval: float = 5
+) -> None:
+    """
+    Run backtest tasks from a broker until told to stop.
+
+    Can be started on any host which can reach the broker, e.g.
+    sweep_worker(("broker-host", 50000), b"secret").
+
+    Args:
+        address: (host, port) of the broker.
+        authkey: Authentication key of the broker.
+        heartbeat_interval: Seconds between heartbeats sent while a task runs.
+        Must be well below the broker's heartbeat_timeout. Defaults to 5.
+    """
+    manager = _WorkerManager(address=address, authkey=authkey)
+    try:
+        manager.connect()
+        tasks = manager.get_task_queue()
+        results = manager.get_result_queue()
+    except (EOFError, ConnectionError):
+        # Broker has gone away (e.g. shut down while we were connecting).
+        return
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    while True:
+        try:
+            task = tasks.get()
+        except (EOFError, ConnectionError):
+            # Broker has gone away.
+            return
+        if task is None:
+            return
+
+        message = {
+            "task_id": task["task_id"],
+            "attempt": task["attempt"],
+            "worker": worker_id,
+        }
+        results.put({**message, "status": "started"})
+        stop_heartbeats = threading.Event()
+        heartbeats = threading.Thread(
+            target=_send_heartbeats,
+            args=(results, message, heartbeat_interval, stop_heartbeats),
+            daemon=True,
+        )
+        heartbeats.start()
+        try:
+            analyser = run_spec(BacktestSpec.from_json(task["spec"]))
+            summary = analyser.summary_stats.iloc[0].to_dict()
+            NAV = {
+                pd.Timestamp(ts).isoformat(): float(NAV)
+                for ts, NAV in analyser.backtest.NAV_record.items()
+            }
+            results.put(
+                {**message, "status": "done", "summary": summary, "NAV": NAV}
+            )
+        except Exception:
+            results.put(
+                {**message, "status": "failed", "error": traceback.format_exc()}
+            )
+        finally:
+            stop_heartbeats.set()
+            heartbeats.join()
+
+
+class SweepBroker:
+    """
+    Broker handing serialized backtest specs to workers and gathering the
+    summary statistics and NAV series back.
+
+    Workers connect with sweep_worker(broker.address, broker.authkey). Failed
+    tasks, tasks whose worker has stopped sending heartbeats (e.g. it crashed)
+    and tasks running longer than task_timeout are retried up to max_retries
+    times.
+
+    NOTE: The queues are served with multiprocessing managers, which unpickle
+    what they receive, so the authkey is all that keeps other hosts out.
+
+    Args:
+        address: (host, port) to serve on. Port 0 picks a free port. Defaults
+        to ("127.0.0.1", 0), use ("", port) to accept remote workers.
+        authkey: Authentication key workers must present. Required when
+        serving on a non-loopback address. Defaults to None (a random key,
+        loopback only).
+        max_retries: Number of times a task is retried. Defaults to 2.
+        task_timeout: Seconds after a task is started before it is assumed
+        lost and retried. Defaults to None (never).
+        heartbeat_timeout: Seconds without a heartbeat from the worker of a
+        started task before it is assumed lost and retried. Defaults to 60.
+        poll_interval: Seconds between checks for lost tasks. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        authkey: Optional[bytes] = None,
+        max_retries: int = 2,
+        task_timeout: Optional[float] = None,
+        heartbeat_timeout: Optional[float] = 60,
+        poll_interval: float = 1,
+    ) -> None:
+        if authkey is None:
+            if not _is_loopback(address[0]):
+                raise ValueError(
+                    "Please provide an authkey to serve on a non-loopback"
+                    f" address ({address[0]!r})."
+                )
+            authkey = os.urandom(32)
+        self.authkey = authkey
+        self.max_retries = max_retries
+        self.task_timeout = task_timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.poll_interval = poll_interval
+        self._manager = _BrokerManager(address=address, authkey=authkey)
+        self._started = False
+        self.failures = dict()
+
+    def start(self) -> None:
+        """Start serving the queues."""
+        self._manager.start()
+        self._tasks = self._manager.get_task_queue()
+        self._results = self._manager.get_result_queue()
+        self._started = True
+
+    def shutdown(self, n_workers: int = 0) -> None:
+        """
+        Stop serving the queues.
+
+        Args:
+            n_workers: Number of stop messages to send to workers first.
+            Workers which do not receive one stop when the broker goes away.
+        """
+        if not self._started:
+            return
+        for _ in range(n_workers):
+            self._tasks.put(None)
+        self._manager.shutdown()
+        self._started = False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Return the (host, port) workers should connect to."""
+        return self._manager.address
+
+    def run(
+        self,
+        specs: List[BacktestSpec],
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[pd.DataFrame, Dict[int, pd.Series]]:
+        """
+        Run specs on the connected workers and gather the results.
+
+        Args:
+            specs: Backtest specs to run. Task ids are positions in this list.
+            progress: Optional callable progress(n_finished, n_tasks) called
+            each time a task finishes (succeeds or finally fails).
+
+        Returns:
+            Tuple of summary dataframe (one row per successful task, with the
+            spec as leading columns followed by the summary statistics except
+            SPEC_STATISTICS) and dictionary of NAV series by task id.
+            Tasks which failed after all retries are left out and recorded in
+            self.failures.
+        """
+        if not self._started:
+            raise ValueError("Please run start() first.")
+
+        spec_json = {
+            task_id: spec.to_json() for task_id, spec in enumerate(specs)
+        }
+        attempts = {task_id: 0 for task_id in spec_json}
+        # task_id -> (worker, start time, last heartbeat) of the current attempt
+        in_flight = dict()
+        summaries = dict()
+        NAV_records = dict()
+        self.failures = dict()
+
+        for task_id in spec_json:
+            self._submit(task_id, spec_json[task_id], attempts[task_id])
+
+        n_finished = 0
+        last_check = time.monotonic()
+        while n_finished < len(spec_json):
+            try:
+                message = self._results.get(timeout=self.poll_interval)
+            except queue.Empty:
+                message = None
+
+            finished = []
+            if message is not None:
+                task_id = message["task_id"]
+                # Ignore messages from superseded attempts and finished tasks.
+                stale = (
+                    message["attempt"] != attempts[task_id]
+                    or task_id in summaries
+                    or task_id in self.failures
+                )
+                if stale:
+                    pass
+                elif message["status"] == "started":
+                    now = time.monotonic()
+                    in_flight[task_id] = (message["worker"], now, now)
+                elif message["status"] == "heartbeat":
+                    if task_id in in_flight:
+                        worker, start, _ = in_flight[task_id]
+                        in_flight[task_id] = (worker, start, time.monotonic())
+                elif message["status"] == "done":
+                    in_flight.pop(task_id, None)
+                    NAV_record = pd.Series(message["NAV"], name="NAV")
+                    NAV_record.index = pd.to_datetime(NAV_record.index)
+                    summaries[task_id] = message["summary"]
+                    NAV_records[task_id] = NAV_record
+                    finished.append(task_id)
+                else:
+                    in_flight.pop(task_id, None)
+                    if not self._retry(task_id, attempts, spec_json):
+                        self.failures[task_id] = message["error"]
+                        finished.append(task_id)
+
+            # Look for lost tasks.
+            if time.monotonic() - last_check >= self.poll_interval:
+                last_check = time.monotonic()
+                for task_id in self._lost_tasks(in_flight):
+                    del in_flight[task_id]
+                    if not self._retry(task_id, attempts, spec_json):
+                        self.failures[task_id] = "Task lost."
+                        finished.append(task_id)
+
+            for _ in finished:
+                n_finished += 1
+                if progress is not None:
+                    progress(n_finished, len(spec_json))
+
+        if self.failures:
+            warnings.warn(
+                f"{len(self.failures)} of {len(spec_json)} backtests failed,"
+                " see SweepBroker.failures."
+            )
+
+        # Statistics which repeat a spec parameter are left out.
+        summary_df = pd.DataFrame.from_dict(
+            {
+                task_id: {
+                    **specs[task_id].to_dict(),
+                    **{
+                        k: v
+                        for k, v in summaries[task_id].items()
+                        if k not in SPEC_STATISTICS
+                    },
+                }
+                for task_id in sorted(summaries)
+            },
+            orient="index",
+        )
+        summary_df.index.name = "Task"
+
+        return summary_df, NAV_records
+
+    def _submit(self, task_id: int, spec_json: str, attempt: int) -> None:
+        """Put a task on the task queue."""
+        self._tasks.put(
+            {"task_id": task_id, "attempt": attempt, "spec": spec_json}
+        )
+
+    def _retry(
+        self, task_id: int, attempts: Dict[int, int], spec_json: Dict[int, str]
+    ) -> bool:
+        """Resubmit a task if it has retries left. Return True if so."""
+        if attempts[task_id] >= self.max_retries:
+            return False
+        attempts[task_id] += 1
+        self._submit(task_id, spec_json[task_id], attempts[task_id])
+        return True
+
+    def _lost_tasks(
+        self, in_flight: Dict[int, Tuple[str, float, float]]
+    ) -> List[int]:
+        """
+        Return the in-flight tasks which have exceeded task_timeout or
+        heartbeat_timeout.
+        """
+        now = time.monotonic()
+        return [
+            task_id
+            for task_id, (_, start, last_heartbeat) in in_flight.items()
+            if (
+                self.task_timeout is not None
+                and now - start > self.task_timeout
+            )
+            or (
+                self.heartbeat_timeout is not None
+                and now - last_heartbeat > self.heartbeat_timeout
+            )
+        ]
+
+
+class LocalSweepBroker(SweepBroker):
+    """
+    Stand-in for a multi-host deployment: a broker with worker processes on
+    this machine. Workers which die are replaced and their tasks retried.
+
+    Args:
+        n_workers: Number of worker processes. Defaults to os.cpu_count().
+        **kwargs: Arguments for SweepBroker.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._workers = []
+
+    def start(self) -> None:
+        """Start serving the queues and the worker processes."""
+        super().start()
+        self._workers = [self._start_worker() for _ in range(self.n_workers)]
+
+    def shutdown(self, n_workers: int = 0) -> None:
+        """Stop the worker processes and the broker."""
+        super().shutdown(n_workers=n_workers or len(self._workers))
+        for worker in self._workers:
+            worker.join(timeout=self.poll_interval)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def __enter__(self) -> "LocalSweepBroker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def _start_worker(self) -> mp.Process:
+        """Start a worker process connected to this broker."""
+        worker = mp.Process(
+            target=sweep_worker, args=(self.address, self.authkey), daemon=True
+        )
+        worker.start()
+        return worker
+
+    def _lost_tasks(
+        self, in_flight: Dict[int, Tuple[str, float, float]]
+    ) -> List[int]:
+        """Return tasks lost to dead workers (or timeouts), replacing them."""
+        for i, worker in enumerate(self._workers):
+            if not worker.is_alive():
+                self._workers[i] = self._start_worker()
+
+        # NOTE: All workers are local, so a task whose worker is not one of the
+        # live workers is lost. This includes workers which were replaced
+        # before their "started" message was read.
+        hostname = socket.gethostname()
+        live = {f"{hostname}:{worker.pid}" for worker in self._workers}
+        lost = {
+            task_id
+            for task_id, (worker_id, _, _) in in_flight.items()
+            if worker_id not in live
+        }
+        return sorted(lost | set(super()._lost_tasks(in_flight)))
+
+
+def _is_loopback(host: str) -> bool:
+    """Return True if host is a loopback address."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def local_sweep(
+    specs: List[BacktestSpec],
+    n_workers: Optional[int] = None,
+    max_retries: int = 2,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[pd.DataFrame, Dict[int, pd.Series]]:
+    """
+    Run a sweep of backtests on local worker processes.
+
+    Args:
+        specs: Backtest specs to run.
+        n_workers: Number of worker processes. Defaults to os.cpu_count().
+        max_retries: Number of times a failed task is retried. Defaults to 2.
+        progress: Optional callable progress(n_finished, n_tasks).
+
+    Returns:
+        Tuple of summary dataframe and dictionary of NAV series by task id.
+    """
+    with LocalSweepBroker(
+        n_workers=max(1, min(n_workers or os.cpu_count() or 1, len(specs))),
+        max_retries=max_retries,
+    ) as broker:
+        return broker.run(specs, progress=progress)
+
+
+def print_progress(n_finished: int, n_tasks: int) -> None:
+    """
+    Print sweep progress.
+
+    Args:
+        n_finished: Number of finished tasks.
+        n_tasks: Total number of tasks.
+    """
+    print(f"Backtests finished: {n_finished}/{n_tasks}", flush=True)
@@ -4,35 +4,40 @@ from typing import List, Tuple, Union
 
 import matplotlib.pyplot as plt
 import pandas as pd
+from ingestion import DataValidationError, validate_data
 
 
 def data_collector(
-    data_filepath: str, plot: bool = False
+    data_filepath: str,
+    plot: bool = False,
+    date_format: str = "%Y-%d-%m",
+    tolerance: float = 1e-6,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Collects input data from excel file, checks data is valid and returns a
     dataframe.
 
+    For data spread over many files, see ingestion.ingest.
+
     Args:
         data_filepath: Filepath to excel file.
         plot: Boolean to plot price data. Defaults to False.
+        date_format: Format of dates stored as text. Defaults to "%Y-%d-%m".
+        tolerance: Tolerance on the sum of weights. Defaults to 1e-6.
 
     Returns:
         Tuple of prices dataframe and weights dataframe.
     """
     prices_df = pd.read_excel(data_filepath, sheet_name="Data", index_col=0)
-    prices_df.index = pd.to_datetime(prices_df.index, format="%Y-%d-%m")
+    prices_df.index = pd.to_datetime(prices_df.index, format=date_format)
 
     weights_df = pd.read_excel(data_filepath, sheet_name="Weights", index_col=0)
-    weights_df.index = pd.to_datetime(weights_df.index, format="%Y-%d-%m")
-
-    # Check prices are valid
-    if (prices_df <= 0).any().any():
-        raise ValueError("Price data contains negative values.")
+    weights_df.index = pd.to_datetime(weights_df.index, format=date_format)
 
-    # Check total weights are valid
-    if any(weights_df.sum(axis=1)) != 1:
-        raise ValueError("Total weights do not sum to 1.")
+    # Check prices and weights are valid (all checks at once)
+    report = validate_data(prices_df, weights_df, tolerance=tolerance)
+    if len(report):
+        raise DataValidationError(report)
 
     if plot:
         plt.figure()
@@ -46,6 +51,11 @@ def data_collector(
 
 # NOTE: I intend to make a dedicated package to do this task at some point as I
 # often find myself doing it.
+def _latex_escape(text: str) -> str:
+    """Escape LaTeX special characters in text."""
+    return "".join("\\" + char if char in "&%$#_{}" else char for char in text)
+
+
 def excel_summary_2_latex(filepath: Union[str, List[str]]) -> None:
     """
     Convert backtest summary data from excel to LaTeX table for inclusion in
@@ -72,9 +82,16 @@ def excel_summary_2_latex(filepath: Union[str, List[str]]) -> None:
 
         # Flake8 complains about the % symbol in the lambda function but it is
         # needed for writing percentages to latex table.
+        # Transaction Cost is empty for runs with a cost model.
         summary_df[pct_columns] = summary_df[pct_columns].applymap(
-            lambda x: "{:.2f}".format(100 * x) + "\%"  # noqa: W605
+            lambda x: "n/a"
+            if pd.isna(x)
+            else "{:.2f}".format(100 * x) + "\%"  # noqa: W605
         )
+        if "Cost Model" in summary_df:
+            summary_df["Cost Model"] = summary_df["Cost Model"].map(
+                _latex_escape, na_action="ignore"
+            )
         summary_df[["Sharpe Ratio", "Sharpe Ratio (Ann.)"]] = summary_df[
             ["Sharpe Ratio", "Sharpe Ratio (Ann.)"]
         ].applymap(lambda x: "{:.2f}".format(x))
@@ -82,7 +99,8 @@ def excel_summary_2_latex(filepath: Union[str, List[str]]) -> None:
         summary_df_format = summary_df.T
         summary_df_list.append(summary_df_format)
 
-    summary_df_format = pd.concat(summary_df_list, axis=1)
+    # Cost Model is missing for runs with a flat transaction cost.
+    summary_df_format = pd.concat(summary_df_list, axis=1).fillna("n/a")
 
     caption = "Portfolio performance summary; daily rebalancing."
 
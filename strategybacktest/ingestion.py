@@ -0,0 +1,258 @@
+"""Data ingestion from many files with validation."""
+
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# NOTE: Every input file is read into a wide dataframe (dates x tickers). A
+# per-ticker file is then one column and a per-date file is one row, so both
+# layouts (and a mix of them) are combined the same way: stacked into one long
+# series, checked for duplicates and unstacked onto the union calendar.
+
+ISSUE_COLUMNS = ["Check", "Date", "Ticker", "Value"]
+
+
+class DataValidationError(ValueError):
+    """
+    Input data failed validation.
+
+    Args:
+        report: Dataframe of offending rows (see validate_data).
+    """
+
+    def __init__(self, report: pd.DataFrame) -> None:
+        self.report = report
+        counts = report["Check"].value_counts()
+        summary = ", ".join(f"{check}: {n}" for check, n in counts.items())
+        super().__init__(f"Input data failed validation ({summary}).")
+
+
+def read_file(filepath: str, date_format: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a csv, excel or parquet file of dates (first column) x tickers.
+
+    A file with a single generic column ("Price", "Close" or "Value") is taken
+    to be a per-ticker file and the column is named after the file, e.g.
+    "data/A.csv" gives ticker "A".
+
+    Args:
+        filepath: Filepath to input file.
+        date_format: Date format of the first column. Defaults to None (infer).
+
+    Returns:
+        Dataframe of dates x tickers.
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == ".csv":
+        frame = pd.read_csv(filepath, index_col=0)
+    elif extension in (".xlsx", ".xls"):
+        frame = pd.read_excel(filepath, index_col=0)
+    elif extension == ".parquet":
+        frame = pd.read_parquet(filepath)
+        # NOTE: If the dates were stored as a column, the index is a RangeIndex
+        # which to_datetime would silently read as nanoseconds since 1970.
+        if pd.api.types.is_numeric_dtype(frame.index):
+            frame = frame.set_index(frame.columns[0])
+    else:
+        raise ValueError(f"Unsupported file type '{extension}'.")
+
+    frame.index = pd.to_datetime(frame.index, format=date_format)
+    if frame.shape[1] == 1 and frame.columns[0] in ("Price", "Close", "Value"):
+        ticker = os.path.splitext(os.path.basename(filepath))[0]
+        frame.columns = [ticker]
+    return frame
+
+
+def load_frames(
+    filepaths: List[str],
+    reader: Callable[[str], pd.DataFrame] = read_file,
+    n_workers: Optional[int] = None,
+) -> List[pd.DataFrame]:
+    """
+    Read many files in parallel.
+
+    Args:
+        filepaths: Filepaths to input files.
+        reader: Function reading a file into a dataframe of dates x tickers.
+        Defaults to read_file.
+        n_workers: Number of threads. Defaults to None (see
+        concurrent.futures.ThreadPoolExecutor).
+
+    Returns:
+        List of dataframes, in the order of filepaths.
+    """
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(reader, filepaths))
+
+
+def align_frames(
+    frames: List[pd.DataFrame],
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Combine dataframes of dates x tickers onto the union calendar.
+
+    Args:
+        frames: Dataframes of dates x tickers.
+
+    Returns:
+        Tuple of aligned dataframe (union of dates x union of tickers, missing
+        values are NaN) and dataframe of duplicated (date, ticker) values.
+    """
+    long = pd.concat(
+        [
+            frame.rename_axis(index="Date", columns="Ticker").stack()
+            for frame in frames
+        ]
+    )
+    duplicated = long.index.duplicated(keep=False)
+    duplicates = long[duplicated].rename("Value").reset_index()
+    aligned = long[~long.index.duplicated(keep="first")].unstack("Ticker")
+    aligned = aligned.sort_index()
+    aligned.index.name = None
+    aligned.columns.name = None
+    return aligned, duplicates
+
+
+def validate_data(
+    prices_df: pd.DataFrame,
+    weights_df: pd.DataFrame,
+    tolerance: float = 1e-6,
+    duplicates: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Run all data checks and report every offending row.
+
+    Checks are vectorized over the whole data: non-positive prices, missing
+    prices (gaps on the calendar), weights not summing to 1 (within
+    tolerance), weights for dates without prices and duplicated values.
+
+    Args:
+        prices_df: Dataframe of prices (dates x tickers).
+        weights_df: Dataframe of weights (dates x tickers).
+        tolerance: Tolerance on the sum of weights. Defaults to 1e-6.
+        duplicates: Optional dataframe of duplicated values from
+        align_frames.
+
+    Returns:
+        Dataframe of issues with columns Check, Date, Ticker and Value. Empty
+        if the data is valid.
+    """
+    prices = prices_df.to_numpy(dtype=float)
+    dates = prices_df.index.to_numpy()
+    tickers = prices_df.columns.to_numpy()
+    issues = []
+
+    def cell_issues(check: str, mask: np.ndarray) -> None:
+        rows, cols = np.nonzero(mask)
+        issues.append(
+            pd.DataFrame(
+                {
+                    "Check": check,
+                    "Date": dates[rows],
+                    "Ticker": tickers[cols],
+                    "Value": prices[rows, cols],
+                }
+            )
+        )
+
+    # NaN compares False, so gaps are only reported as gaps.
+    with np.errstate(invalid="ignore"):
+        cell_issues("Non-positive price", prices <= 0)
+    cell_issues("Missing price", np.isnan(prices))
+
+    if prices_df.index.has_duplicates:
+        duplicated = prices_df.index.duplicated(keep=False)
+        issues.append(
+            pd.DataFrame(
+                {
+                    "Check": "Duplicate date",
+                    "Date": dates[duplicated],
+                    "Ticker": None,
+                    "Value": np.nan,
+                }
+            )
+        )
+    if duplicates is not None and len(duplicates):
+        issues.append(duplicates.assign(Check="Duplicate value"))
+
+    weight_sums = weights_df.sum(axis=1)
+    bad_sums = (weight_sums - 1).abs() > tolerance
+    issues.append(
+        pd.DataFrame(
+            {
+                "Check": "Weights do not sum to 1",
+                "Date": weights_df.index[bad_sums],
+                "Ticker": None,
+                "Value": weight_sums[bad_sums].to_numpy(),
+            }
+        )
+    )
+    off_calendar = ~weights_df.index.isin(prices_df.index)
+    issues.append(
+        pd.DataFrame(
+            {
+                "Check": "Weights date without prices",
+                "Date": weights_df.index[off_calendar],
+                "Ticker": None,
+                "Value": np.nan,
+            }
+        )
+    )
+
+    report = pd.concat(
+        [issue for issue in issues if len(issue)] or [pd.DataFrame()],
+        ignore_index=True,
+    )
+    return report.reindex(columns=ISSUE_COLUMNS)
+
+
+def ingest(
+    price_filepaths: List[str],
+    weight_filepaths: List[str],
+    tolerance: float = 1e-6,
+    reader: Callable[[str], pd.DataFrame] = read_file,
+    n_workers: Optional[int] = None,
+    strict: bool = True,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load, align and validate prices and weights from many files, e.g. one file
+    per ticker or one file per date.
+
+    Args:
+        price_filepaths: Filepaths to price files.
+        weight_filepaths: Filepaths to weight files.
+        tolerance: Tolerance on the sum of weights. Defaults to 1e-6.
+        reader: Function reading a file into a dataframe of dates x tickers.
+        Defaults to read_file.
+        n_workers: Number of threads reading files. Defaults to None.
+        strict: Raise DataValidationError if any check fails. Defaults to
+        True. Otherwise a warning is given.
+
+    Returns:
+        Tuple of prices dataframe (union calendar x tickers) and weights
+        dataframe (tickers in the same order as prices, missing weights 0).
+    """
+    frames = load_frames(
+        price_filepaths + weight_filepaths, reader=reader, n_workers=n_workers
+    )
+    prices_df, price_duplicates = align_frames(frames[: len(price_filepaths)])
+    weights_df, weight_duplicates = align_frames(frames[len(price_filepaths) :])
+    weights_df = weights_df.reindex(columns=prices_df.columns).fillna(0)
+
+    report = validate_data(
+        prices_df,
+        weights_df,
+        tolerance=tolerance,
+        duplicates=pd.concat([price_duplicates, weight_duplicates]),
+    )
+    if len(report):
+        error = DataValidationError(report)
+        if strict:
+            raise error
+        warnings.warn(str(error))
+
+    return prices_df, weights_df
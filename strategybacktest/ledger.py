@@ -0,0 +1,177 @@
+"""Append-only columnar ledger for trades and holdings."""
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# NOTE: "cost" is the transaction cost paid from cash for the trade.
+TRADE_COLUMNS = {
+    "timestamp": "datetime64[ns]",
+    "asset": "int32",
+    "quantity": "float64",
+    "price": "float64",
+    "cost": "float64",
+}
+
+HOLDING_COLUMNS = {
+    "timestamp": "datetime64[ns]",
+    "asset": "int32",
+    "quantity": "float64",
+    "price": "float64",
+}
+
+
+class Ledger:
+    """
+    Append-only ledger stored as one numpy array per column.
+
+    Rows are appended in blocks (e.g. all trades for a timestamp) and the
+    arrays grow geometrically, so appending is cheap for long backtests. Assets
+    are stored as integer ids, see assets.
+
+    Args:
+        columns: Dictionary of numpy dtype for each column. Must include an
+        "asset" column.
+        capacity: Initial number of rows allocated. Defaults to 1024.
+    """
+
+    def __init__(self, columns: Dict[str, str], capacity: int = 1024) -> None:
+        self.columns = columns
+        self._arrays = {
+            name: np.empty(capacity, dtype=dtype)
+            for name, dtype in columns.items()
+        }
+        self._length = 0
+        self._assets = []
+        self._asset_ids = {}
+
+    def append(self, tickers: List[str], **values) -> None:
+        """
+        Append a block of rows.
+
+        Args:
+            tickers: Ticker of each row.
+            **values: Value(s) for each of the other columns. Scalars (e.g. the
+            timestamp) are repeated for every row.
+        """
+        n_rows = len(tickers)
+        if n_rows == 0:
+            return
+        self._reserve(self._length + n_rows)
+        rows = slice(self._length, self._length + n_rows)
+        self._arrays["asset"][rows] = [
+            self._asset_id(ticker) for ticker in tickers
+        ]
+        for name, value in values.items():
+            self._arrays[name][rows] = value
+        self._length += n_rows
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Return the named column as a read-only view (no copy).
+
+        Args:
+            name: Column name.
+        """
+        view = self._arrays[name][: self._length]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def assets(self) -> List[str]:
+        """Return tickers, indexed by asset id."""
+        return self._assets
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only pickle the filled rows, not the spare capacity.
+        state = self.__dict__.copy()
+        state["_arrays"] = {
+            name: array[: self._length] for name, array in self._arrays.items()
+        }
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        # Restore spare capacity so appending stays cheap.
+        self._arrays = {
+            name: np.array(array) for name, array in self._arrays.items()
+        }
+        self._reserve(max(2 * self._length, 1))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the ledger as a dataframe with tickers as a categorical."""
+        frame = pd.DataFrame({name: self.column(name) for name in self.columns})
+        frame["asset"] = pd.Categorical.from_codes(
+            frame["asset"], categories=self._assets
+        )
+        return frame
+
+    def to_npz(self, filepath: str) -> None:
+        """
+        Save the ledger as a (compressed) numpy .npz file, one array per column.
+
+        Args:
+            filepath: Filepath to output file.
+        """
+        np.savez_compressed(
+            filepath,
+            assets=np.array(self._assets, dtype=str),
+            **{name: self.column(name) for name in self.columns},
+        )
+
+    @classmethod
+    def from_npz(cls, filepath: str) -> "Ledger":
+        """
+        Load a ledger saved with to_npz().
+
+        Args:
+            filepath: Filepath to .npz file.
+        """
+        with np.load(filepath) as data:
+            columns = {
+                name: data[name].dtype.str
+                for name in data.files
+                if name != "assets"
+            }
+            ledger = cls(columns, capacity=max(len(data["asset"]), 1))
+            ledger._assets = [str(ticker) for ticker in data["assets"]]
+            ledger._asset_ids = {
+                ticker: i for i, ticker in enumerate(ledger._assets)
+            }
+            for name in columns:
+                ledger._arrays[name][: len(data[name])] = data[name]
+            ledger._length = len(data["asset"])
+        return ledger
+
+    def to_parquet(self, filepath: str) -> None:
+        """
+        Save the ledger as a parquet file (requires pyarrow or fastparquet).
+
+        Args:
+            filepath: Filepath to output file.
+        """
+        self.to_frame().to_parquet(filepath, index=False)
+
+    def _asset_id(self, ticker: str) -> int:
+        """Return the asset id for a ticker, adding it if new."""
+        if ticker not in self._asset_ids:
+            self._asset_ids[ticker] = len(self._assets)
+            self._assets.append(ticker)
+        return self._asset_ids[ticker]
+
+    def _reserve(self, n_rows: int) -> None:
+        """Grow the arrays to hold at least n_rows."""
+        capacity = len(self._arrays["asset"])
+        if n_rows <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < n_rows:
+            capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[: self._length] = array[: self._length]
+            self._arrays[name] = grown
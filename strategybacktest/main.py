@@ -1,10 +1,7 @@
 """Main Script for running the backtest."""
 
 import matplotlib.pyplot as plt  # noqa: F401
-from backtest import Backtest, BacktestAnalysis
-from functions import data_collector
-from portfolio import Portfolio
-from strategy import DummyStrategy, MomentumStrategy  # noqa: F401
+from spec import BacktestSpec, run_spec
 
 
 def run_backtest(
@@ -13,6 +10,7 @@ def run_backtest(
     transaction_cost: float,
     plot: bool,
     save_plots: bool = False,
+    show_plots: bool = True,
 ) -> None:
     """
     Run the backtest.
@@ -23,53 +21,37 @@ def run_backtest(
         transaction_cost: Percentage transaction cost per trade.
         plot: Plot backtest results.
         save_plots: Save backtest plots. Defaults to False.
+        show_plots: Show backtest plots. Set to False when running headless.
+        Defaults to True.
     """
-    data_filepath = ".data/Task.xlsx"
-
-    # Collect data.
-    # I can plot here to check for outliers. There are none.
-    prices_df, weights_df = data_collector(data_filepath, plot=False)
-
-    # NOTE: Asset universe for future versions
-    # asset_universe = list(prices_df.columns)
-
-    # Initialise strategy
-    strategy = DummyStrategy(weights_df=weights_df)
-    # strategy = MomentumStrategy(weights_df=weights_df, prices_df=prices_df)
-
-    # Initialise portfolio
-    portfolio = Portfolio(
+    spec = BacktestSpec(
         initial_capital=initial_capital,
-        price_data_source=prices_df,
+        risk_free_rate=risk_free_rate,
         transaction_cost=transaction_cost,
     )
-    # Initialise backtest
-    backtest = Backtest(
-        strategy=strategy,
-        timestamps=prices_df.index.values,
-        portfolio=portfolio,
-        price_data_source=prices_df,
-    )
-    # Run backtest
-    backtest.run_backtest()
 
-    # Run analysis
-    analyser = BacktestAnalysis(
-        backtest=backtest, risk_free_rate=risk_free_rate
-    )
-    analyser.compute_stats()
+    # Collect data, run backtest and compute statistics.
+    # NOTE: The data is validated in data_collector. I can plot there to check
+    # for outliers. There are none.
+    analyser = run_spec(spec)
+
+    run_name = f"ic{initial_capital}_tc{transaction_cost}_rf{risk_free_rate}"
 
     # Plot results
     if plot:
-        analyser.plot(save=save_plots)
-        analyser.underwater_plot(save=save_plots)
-        analyser.volatility_plot(save=save_plots)
+        for plot_name, plot_method in (
+            ("nav", analyser.plot),
+            ("underwater", analyser.underwater_plot),
+            ("volatility", analyser.volatility_plot),
+        ):
+            plot_method(
+                save=save_plots,
+                filepath=f"output/{plot_name}_{run_name}.png",
+                show=show_plots,
+            )
 
     # Save results to excel
-    analyser.output_to_excel(
-        filepath=f"output/summary_ic{initial_capital}_tc{transaction_cost}"
-        f"_rf{risk_free_rate}.xlsx"
-    )
+    analyser.output_to_excel(filepath=f"output/summary_{run_name}.xlsx")
 
 
 if __name__ == "__main__":
@@ -95,3 +77,21 @@ if __name__ == "__main__":
     #             risk_free_rate=risk_free_rate_,
     #             transaction_cost=transaction_cost_,
     #         )
+
+    # Run a sweep of backtests on local worker processes. Workers on other
+    # hosts can instead connect to a SweepBroker with sweep_worker().
+    # from distributed import local_sweep, print_progress
+    # specs = [
+    #     BacktestSpec(initial_capital, risk_free_rate_, transaction_cost_)
+    #     for risk_free_rate_ in risk_free_rate
+    #     for transaction_cost_ in transaction_cost
+    # ]
+    # summary_df, NAV_records = local_sweep(specs, progress=print_progress)
+    # Render the plots of every run (headless, in parallel) to
+    # output/sweep/<task>/.
+    # from rendering import render_runs
+    # render_runs(
+    #     NAV_records,
+    #     "output/sweep",
+    #     transaction_costs=summary_df["transaction_cost"].to_dict(),
+    # )
@@ -1,9 +1,12 @@
 """Portfolio class for backtesting."""
 
 
-from typing import Dict
+from typing import Any, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+from costs import CostModel
+from ledger import HOLDING_COLUMNS, TRADE_COLUMNS, Ledger
 
 
 class Portfolio:
@@ -23,6 +26,8 @@ class Portfolio:
         just a predetermined dataframe.
         transaction_cost: Percentage transaction
         cost per trade. Defaults to 0.
+        cost_model: Transaction cost model. Defaults to None (use the flat
+        transaction_cost). Costs are paid from cash, so they reduce the NAV.
     """
 
     def __init__(
@@ -30,9 +35,11 @@ class Portfolio:
         initial_capital: float,
         price_data_source: pd.DataFrame,
         transaction_cost: float = 0,
+        cost_model: Optional[CostModel] = None,
     ) -> None:
         self.price_data_source = price_data_source
         self.transaction_cost = transaction_cost
+        self.cost_model = cost_model
         # NOTE: If an asset is absent in self.positions => asset position is 0.
         # (We therefore do not have 0's in self.positions)
         self.positions = dict()
@@ -43,19 +50,30 @@ class Portfolio:
         self._target_positions = {}
         self._prices = {}
         self._rebalance_record = {}
+        self.trade_ledger = Ledger(TRADE_COLUMNS)
+        self.holdings_ledger = Ledger(HOLDING_COLUMNS)
         self._current_weights = {}
         self._initial = True
 
-    def rebalance(self, weights: Dict[str, float], ts: pd.Timestamp) -> None:
+    def rebalance(
+        self,
+        weights: Dict[str, float],
+        ts: pd.Timestamp,
+        prices: Optional[Dict[str, float]] = None,
+    ) -> None:
         """
         Rebalance portfolio according to target weights.
 
         Args:
             weights: Dictionary of target weights.
             ts: Timestamp for rebalance.
+            prices: Dictionary of prices on ts. Defaults to None (look up ts
+            in price_data_source).
         """
         # Get new ts prices
-        self._prices = self.price_data_source.loc[ts].to_dict()
+        if prices is None:
+            prices = self.price_data_source.loc[ts].to_dict()
+        self._prices = prices
 
         # Update NAV from positions and new prices.
         # NOTE: NAV is calculated before rebalancing, it is the same after
@@ -74,7 +92,7 @@ class Portfolio:
         # Daily rebalancing. (Rebalance every day of the backtest).
         if True:
             # Size trades from weights.
-            trades = self._position_sizer(
+            trades, costs = self._position_sizer(
                 target_weights=weights, prices=self._prices
             )
 
@@ -84,9 +102,13 @@ class Portfolio:
                 for k in set(self.positions) | set(trades)
             }
 
-            # Update cash
-            self._cash = self._NAV - self._get_net_asset_value(
-                prices=self._prices
+            self._record_trades(ts=ts, trades=trades, costs=costs)
+
+            # Update cash. Transaction costs are paid from cash.
+            self._cash = (
+                self._NAV
+                - self._get_net_asset_value(prices=self._prices)
+                - sum(costs.values())
             )
 
         self._current_weights = weights
@@ -96,6 +118,37 @@ class Portfolio:
         """Return the NAV for backtest statistics."""
         return self._NAV
 
+    def get_state(self) -> Dict[str, Any]:
+        """Return the state of the portfolio (for checkpointing)."""
+        return {
+            "positions": self.positions,
+            "NAV": self._NAV,
+            "cash": self._cash,
+            "initial": self._initial,
+            "prices": self._prices,
+            "current_weights": self._current_weights,
+            "rebalance_record": self._rebalance_record,
+            "trade_ledger": self.trade_ledger,
+            "holdings_ledger": self.holdings_ledger,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the state returned by get_state.
+
+        Args:
+            state: State of the portfolio.
+        """
+        self.positions = state["positions"]
+        self._NAV = state["NAV"]
+        self._cash = state["cash"]
+        self._initial = state["initial"]
+        self._prices = state["prices"]
+        self._current_weights = state["current_weights"]
+        self._rebalance_record = state["rebalance_record"]
+        self.trade_ledger = state["trade_ledger"]
+        self.holdings_ledger = state["holdings_ledger"]
+
     @property
     def get_initial_capital(self) -> float:
         """Return the Initial Capital for backtesting."""
@@ -103,17 +156,18 @@ class Portfolio:
 
     def _position_sizer(
         self, target_weights: Dict[str, float], prices: Dict[str, float]
-    ) -> Dict[str, int]:
+    ) -> Tuple[Dict[str, int], Dict[str, float]]:
         """
-        Calculate number of shares to buy for the target weights.
+        Calculate number of shares to buy for the target weights and the
+        transaction cost of each trade.
 
         Args:
             target_weights: Target weights for each asset.
             prices: Current prices for each asset.
 
         Returns:
-            Dictionary of trades (number of positions to purchase) for each
-            asset.
+            Tuple of dictionary of trades (number of positions to purchase) for
+            each asset and dictionary of transaction cost for each asset.
         """
         trade_dict = dict()
         for ticker, target_weight in target_weights.items():
@@ -126,29 +180,80 @@ class Portfolio:
             else:
                 current_position_value = 0
 
-            pre_cost_trade_value = (
-                target_position_value - current_position_value
-            )
-
-            # Comission NOTE: Must check if this costs money.
-            cost_trade_value = pre_cost_trade_value * (
-                1 - self.transaction_cost
-            )
-
-            # NOTE: We assume no transaction cost for initial positions. I.e.
-            # assume initial positions are already held.
-            if self._initial:
-                cost_trade_value = target_position_value
+            trade_value = target_position_value - current_position_value
 
             # Whole shares
-            trade_quantity = int(cost_trade_value / prices[ticker])
+            trade_quantity = int(trade_value / prices[ticker])
             # Fractional shares
-            # trade_quantity = cost_trade_value / prices[ticker]
+            # trade_quantity = trade_value / prices[ticker]
 
             trade_dict[ticker] = trade_quantity
 
+        # NOTE: We assume no transaction cost for initial positions. I.e.
+        # assume initial positions are already held.
+        if self._initial:
+            cost_dict = {ticker: 0 for ticker in trade_dict}
+        else:
+            cost_dict = self._trade_costs(trades=trade_dict, prices=prices)
+
         self._initial = False
-        return trade_dict
+        return trade_dict, cost_dict
+
+    def _record_trades(
+        self,
+        ts: pd.Timestamp,
+        trades: Dict[str, int],
+        costs: Dict[str, float],
+    ) -> None:
+        """
+        Append trades and the resulting holdings to the ledgers.
+
+        Args:
+            ts: Timestamp of the trades.
+            trades: Dictionary of trades for each asset.
+            costs: Dictionary of transaction cost (cash paid) for each asset.
+        """
+        ts = pd.Timestamp(ts).to_datetime64()
+        traded = [ticker for ticker, quantity in trades.items() if quantity]
+        self.trade_ledger.append(
+            traded,
+            timestamp=ts,
+            quantity=[trades[ticker] for ticker in traded],
+            price=[self._prices[ticker] for ticker in traded],
+            cost=[costs[ticker] for ticker in traded],
+        )
+        held = [
+            ticker for ticker, quantity in self.positions.items() if quantity
+        ]
+        self.holdings_ledger.append(
+            held,
+            timestamp=ts,
+            quantity=[self.positions[ticker] for ticker in held],
+            price=[self._prices[ticker] for ticker in held],
+        )
+
+    def _trade_costs(
+        self, trades: Dict[str, int], prices: Dict[str, float]
+    ) -> Dict[str, float]:
+        """
+        Compute the transaction cost of each trade, from the cost model or the
+        flat transaction_cost.
+
+        Args:
+            trades: Dictionary of trades for each asset.
+            prices: Current prices for each asset.
+
+        Returns:
+            Dictionary of transaction cost for each asset.
+        """
+        tickers = list(trades)
+        quantities = np.array([trades[ticker] for ticker in tickers], float)
+        trade_prices = np.array([prices[ticker] for ticker in tickers], float)
+        if self.cost_model is None:
+            costs = np.abs(quantities * trade_prices) * self.transaction_cost
+        else:
+            costs = self.cost_model(quantities, trade_prices, tickers)
+        return dict(zip(tickers, np.broadcast_to(costs, quantities.shape)))
 
     def _get_net_asset_value(self, prices: Dict[str, float]) -> float:
         """
@@ -0,0 +1,246 @@
+"""Plot drawing and headless (parallel) rendering of backtest results."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import matplotlib.ticker as mtick
+import numpy as np
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+# NOTE: The draw_* functions are shared by the BacktestAnalysis plots (pyplot,
+# interactive) and render_runs (no pyplot, so no GUI backend or global figure
+# state, which makes rendering safe in worker processes).
+
+
+def decimate_minmax(
+    x: np.ndarray, y: np.ndarray, n_columns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series for display, keeping the minimum and maximum of each
+    of n_columns buckets (e.g. pixel columns) so the line looks the same.
+
+    Args:
+        x: x values (sorted).
+        y: y values. NaNs are dropped.
+        n_columns: Number of buckets.
+
+    Returns:
+        Tuple of decimated x and y values.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    finite = ~np.isnan(y)
+    x, y = x[finite], y[finite]
+    if len(y) <= 2 * n_columns:
+        return x, y
+
+    bucket = np.arange(len(y)) * n_columns // len(y)
+    # Sort by bucket then value: first of each bucket is its min, last its max
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_columns))
+    ends = np.r_[starts[1:], len(y)] - 1
+    keep = np.unique(np.r_[order[starts], order[ends], 0, len(y) - 1])
+    return x[keep], y[keep]
+
+
+def _line(
+    ax: Axes,
+    series: pd.Series,
+    max_points: Optional[int] = None,
+    **kwargs,
+) -> None:
+    """Plot a series, decimated to max_points if given."""
+    x, y = series.index.to_numpy(), series.to_numpy()
+    if max_points is not None:
+        x, y = decimate_minmax(x, y, n_columns=max_points // 2)
+    ax.plot(x, y, **kwargs)
+
+
+def draw_nav(
+    ax: Axes,
+    normalised_NAV: pd.Series,
+    transaction_cost: Optional[float] = None,
+    max_points: Optional[int] = None,
+) -> None:
+    """
+    Draw the NAV record.
+
+    Args:
+        ax: Axes to draw on.
+        normalised_NAV: Time-series of NAV / initial capital.
+        transaction_cost: Transaction cost for the title. Defaults to None.
+        max_points: Maximum number of points to draw. Defaults to None (all).
+    """
+    _line(ax, normalised_NAV, max_points=max_points)
+    title = "NAV - Daily Rebalancing"
+    if transaction_cost is not None:
+        title += f" - {transaction_cost * 100}% Transaction Cost"
+    ax.set_title(title)
+    ax.set_ylabel("NAV / Initial Capital")
+    ax.set_xlabel("Date")
+
+
+def draw_underwater(
+    ax: Axes,
+    daily_drawdown: pd.Series,
+    max_daily_drawdown: pd.Series,
+    max_points: Optional[int] = None,
+) -> None:
+    """
+    Draw the drawdowns.
+
+    Args:
+        ax: Axes to draw on.
+        daily_drawdown: Time-series of drawdown.
+        max_daily_drawdown: Time-series of maximum drawdown so far.
+        max_points: Maximum number of points to draw. Defaults to None (all).
+    """
+    _line(
+        ax, daily_drawdown * 100, max_points=max_points, label="Daily Drawdown"
+    )
+    _line(
+        ax,
+        max_daily_drawdown * 100,
+        max_points=max_points,
+        label="Max Daily Drawdown",
+    )
+    ax.set_title("Underwater Chart")
+    ax.set_ylabel("Drawdown")
+    ax.set_xlabel("Date")
+    ax.yaxis.set_major_formatter(mtick.PercentFormatter(decimals=1))
+    ax.legend()
+
+
+def draw_volatility(
+    ax: Axes,
+    rolling_volatility: pd.Series,
+    max_points: Optional[int] = None,
+) -> None:
+    """
+    Draw the rolling volatility.
+
+    Args:
+        ax: Axes to draw on.
+        rolling_volatility: Time-series of rolling 21 day volatility (ann.).
+        max_points: Maximum number of points to draw. Defaults to None (all).
+    """
+    _line(
+        ax,
+        rolling_volatility * 100,
+        max_points=max_points,
+        label="Rolling 21 day Volatility",
+    )
+    average_value = rolling_volatility.mean() * 100
+    ax.axhline(
+        y=average_value, color="black", linestyle="dashed", label="Average"
+    )
+    ax.set_title("Volatility (Ann.)")
+    ax.set_xlabel("Date")
+    ax.legend()
+    ax.yaxis.set_major_formatter(mtick.PercentFormatter(decimals=1))
+
+
+def render_run(
+    NAV: pd.Series,
+    output_dir: str,
+    transaction_cost: Optional[float] = None,
+    dpi: int = 100,
+    decimate: bool = True,
+) -> List[str]:
+    """
+    Render the NAV, underwater and volatility plots of one run to files,
+    without pyplot.
+
+    Args:
+        NAV: Time-series of NAV.
+        output_dir: Directory for the run's plots (created if needed).
+        transaction_cost: Transaction cost for the NAV title. Defaults to None.
+        dpi: Resolution of the saved plots. Defaults to 100.
+        decimate: Downsample series to two points per pixel column. Defaults
+        to True.
+
+    Returns:
+        Filepaths of the saved plots.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    NAV = NAV.sort_index()
+    # Same definitions as BacktestAnalysis
+    daily_drawdown = NAV / NAV.cummax() - 1
+    max_daily_drawdown = daily_drawdown.cummin()
+    rolling_volatility = NAV.pct_change()[1:].rolling(21).std() * np.sqrt(252)
+
+    plots = {
+        "nav": lambda ax, n: draw_nav(
+            ax, NAV / NAV.iloc[0], transaction_cost, max_points=n
+        ),
+        "underwater": lambda ax, n: draw_underwater(
+            ax, daily_drawdown, max_daily_drawdown, max_points=n
+        ),
+        "volatility": lambda ax, n: draw_volatility(
+            ax, rolling_volatility, max_points=n
+        ),
+    }
+    filepaths = []
+    for name, draw in plots.items():
+        fig = Figure()
+        ax = fig.add_subplot()
+        max_points = None
+        if decimate:
+            # Width of the axes in pixels
+            max_points = 2 * int(
+                ax.get_position().width * fig.get_figwidth() * dpi
+            )
+        draw(ax, max_points)
+        filepath = os.path.join(output_dir, f"{name}.png")
+        fig.savefig(filepath, dpi=dpi)
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def render_runs(
+    NAV_records: Dict[Any, pd.Series],
+    output_dir: str,
+    transaction_costs: Optional[Dict[Any, float]] = None,
+    dpi: int = 100,
+    decimate: bool = True,
+    n_workers: Optional[int] = None,
+) -> Dict[Any, List[str]]:
+    """
+    Render the plots of many runs (e.g. a sweep) in a process pool, each run to
+    its own directory output_dir/<run id>/.
+
+    Args:
+        NAV_records: Dictionary of NAV time-series for each run id.
+        output_dir: Directory for the run directories.
+        transaction_costs: Dictionary of transaction cost for each run id, for
+        the NAV titles. Defaults to None.
+        dpi: Resolution of the saved plots. Defaults to 100.
+        decimate: Downsample series to two points per pixel column. Defaults
+        to True.
+        n_workers: Number of worker processes. Defaults to None (see
+        concurrent.futures.ProcessPoolExecutor).
+
+    Returns:
+        Dictionary of saved filepaths for each run id.
+    """
+    transaction_costs = transaction_costs or dict()
+    run_ids = list(NAV_records)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(
+                render_run,
+                NAV_records[run_id],
+                os.path.join(output_dir, str(run_id)),
+                transaction_costs.get(run_id),
+                dpi,
+                decimate,
+            )
+            for run_id in run_ids
+        ]
+        return {
+            run_id: future.result() for run_id, future in zip(run_ids, futures)
+        }
@@ -0,0 +1,203 @@
+"""Bootstrap and Monte Carlo resampling of backtest returns."""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# NOTE: Paths are generated and evaluated as (path x time) arrays, so every
+# metric is computed for all paths at once. Large path counts are split into
+# chunks, each with its own seed from one SeedSequence, so results do not
+# depend on whether the chunks are run in a process pool.
+
+METHODS = ("block", "monte_carlo")
+
+
+def block_bootstrap_paths(
+    returns: np.ndarray,
+    n_paths: int,
+    block_length: int = 21,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Resample return paths with the (circular) moving block bootstrap.
+
+    Blocks of consecutive returns are drawn with replacement, keeping short
+    term autocorrelation and volatility clustering within each block.
+
+    Args:
+        returns: Daily returns.
+        n_paths: Number of paths.
+        block_length: Number of returns in each block. Defaults to 21.
+        rng: Numpy random generator. Defaults to None (new generator).
+
+    Returns:
+        Array of resampled returns (path x time), same length as returns.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    returns = np.asarray(returns, dtype=float)
+    n_returns = len(returns)
+    n_blocks = -(-n_returns // block_length)
+    starts = rng.integers(0, n_returns, size=(n_paths, n_blocks))
+    indices = (starts[:, :, None] + np.arange(block_length)) % n_returns
+    return returns[indices.reshape(n_paths, -1)[:, :n_returns]]
+
+
+def monte_carlo_paths(
+    returns: np.ndarray,
+    n_paths: int,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Simulate return paths from a normal distribution with the mean and
+    volatility of the returns.
+
+    Args:
+        returns: Daily returns.
+        n_paths: Number of paths.
+        rng: Numpy random generator. Defaults to None (new generator).
+
+    Returns:
+        Array of simulated returns (path x time), same length as returns.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    returns = np.asarray(returns, dtype=float)
+    return rng.normal(
+        loc=returns.mean(),
+        scale=returns.std(ddof=1),
+        size=(n_paths, len(returns)),
+    )
+
+
+def path_metrics(paths: np.ndarray, risk_free_rate: float = 0) -> pd.DataFrame:
+    """
+    Compute backtest statistics for each return path.
+
+    Definitions follow BacktestAnalysis (252 trading days a year).
+
+    Args:
+        paths: Array of daily returns (path x time).
+        risk_free_rate: (annual) Risk free rate. Defaults to 0.
+
+    Returns:
+        Dataframe of statistics, one row per path.
+    """
+    NAV = np.cumprod(1 + paths, axis=1)
+    total_return = NAV[:, -1] - 1
+    # Number of NAVs, including the initial one
+    n_NAV = paths.shape[1] + 1
+    volatility = paths.std(axis=1, ddof=1)
+    peak_NAV = np.maximum(np.maximum.accumulate(NAV, axis=1), 1)
+    max_drawdown = np.abs(np.minimum((NAV / peak_NAV - 1).min(axis=1), 0))
+
+    return pd.DataFrame(
+        {
+            "Total Return": total_return,
+            "Return (Ann.)": (1 + total_return) ** (252 / n_NAV) - 1,
+            "Sharpe Ratio (Ann.)": np.sqrt(252)
+            * (paths.mean(axis=1) - risk_free_rate / 252)
+            / volatility,
+            "Volatility (Ann.)": volatility * np.sqrt(252),
+            "Max Drawdown": max_drawdown,
+        }
+    )
+
+
+def _chunk_metrics(
+    returns: np.ndarray,
+    n_paths: int,
+    method: str,
+    block_length: int,
+    risk_free_rate: float,
+    seed: np.random.SeedSequence,
+) -> pd.DataFrame:
+    """Generate one chunk of paths and compute their statistics."""
+    rng = np.random.default_rng(seed)
+    if method == "block":
+        paths = block_bootstrap_paths(
+            returns, n_paths, block_length=block_length, rng=rng
+        )
+    else:
+        paths = monte_carlo_paths(returns, n_paths, rng=rng)
+    return path_metrics(paths, risk_free_rate=risk_free_rate)
+
+
+def resample_metrics(
+    returns: np.ndarray,
+    n_paths: int = 10000,
+    method: str = "block",
+    block_length: int = 21,
+    risk_free_rate: float = 0,
+    seed: Optional[int] = None,
+    chunk_size: int = 10000,
+    n_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Compute backtest statistics over resampled return paths.
+
+    Args:
+        returns: Daily returns.
+        n_paths: Number of paths. Defaults to 10000.
+        method: "block" (block bootstrap) or "monte_carlo". Defaults to
+        "block".
+        block_length: Block length for the block bootstrap. Defaults to 21.
+        risk_free_rate: (annual) Risk free rate. Defaults to 0.
+        seed: Random seed. Defaults to None.
+        chunk_size: Maximum number of paths held in memory at once (per
+        worker). Defaults to 10000.
+        n_workers: Number of worker processes. Defaults to None (run in this
+        process).
+
+    Returns:
+        Dataframe of statistics, one row per path.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Choose from {METHODS}.")
+    if n_paths < 1:
+        raise ValueError("n_paths must be at least 1.")
+    if block_length < 1:
+        raise ValueError("block_length must be at least 1.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    returns = np.asarray(returns, dtype=float)
+    chunks = [
+        min(chunk_size, n_paths - start)
+        for start in range(0, n_paths, chunk_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    args = [
+        (returns, n_chunk, method, block_length, risk_free_rate, seed_)
+        for n_chunk, seed_ in zip(chunks, seeds)
+    ]
+
+    if n_workers is None or len(chunks) == 1:
+        metrics = [_chunk_metrics(*args_) for args_ in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            metrics = list(executor.map(_chunk_metrics, *zip(*args)))
+
+    return pd.concat(metrics, ignore_index=True)
+
+
+def confidence_intervals(
+    metrics: pd.DataFrame, confidence: float = 0.95
+) -> pd.DataFrame:
+    """
+    Compute (percentile) confidence intervals of resampled statistics.
+
+    Args:
+        metrics: Dataframe of statistics, one row per path.
+        confidence: Confidence level. Defaults to 0.95.
+
+    Returns:
+        Dataframe with the mean and lower and upper bounds of each statistic.
+    """
+    alpha = (1 - confidence) / 2
+    return pd.DataFrame(
+        {
+            "Mean": metrics.mean(),
+            f"Lower ({alpha:.1%})": metrics.quantile(alpha),
+            f"Upper ({1 - alpha:.1%})": metrics.quantile(1 - alpha),
+        }
+    )
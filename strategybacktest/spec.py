@@ -0,0 +1,162 @@
+"""Backtest specification and local execution."""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+from backtest import Backtest, BacktestAnalysis
+from functions import data_collector
+from portfolio import Portfolio
+from strategy import DummyStrategy, MomentumStrategy
+
+# Strategies which can be referenced by name in a spec. Specs are sent to
+# workers as JSON, so strategies are named rather than passed as objects.
+STRATEGIES = {
+    "dummy": DummyStrategy,
+    "momentum": MomentumStrategy,
+}
+
+
+class BacktestSpec:
+    """
+    Serializable description of a single backtest run.
+
+    The same spec is used for a local run (main.run_backtest) and for runs
+    distributed to sweep workers.
+
+    Args:
+        initial_capital: Initial capital to invest.
+        risk_free_rate: Risk free rate.
+        transaction_cost: Percentage transaction cost per trade.
+        data_filepath: Filepath to excel input data. Defaults to
+        ".data/Task.xlsx".
+        strategy: Name of strategy in STRATEGIES. Defaults to "dummy".
+    """
+
+    def __init__(
+        self,
+        initial_capital: float,
+        risk_free_rate: float,
+        transaction_cost: float,
+        data_filepath: str = ".data/Task.xlsx",
+        strategy: str = "dummy",
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy '{strategy}'. Choose from"
+                f" {list(STRATEGIES)}."
+            )
+        self.initial_capital = initial_capital
+        self.risk_free_rate = risk_free_rate
+        self.transaction_cost = transaction_cost
+        self.data_filepath = data_filepath
+        self.strategy = strategy
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the spec as a dictionary."""
+        return {
+            "initial_capital": self.initial_capital,
+            "risk_free_rate": self.risk_free_rate,
+            "transaction_cost": self.transaction_cost,
+            "data_filepath": self.data_filepath,
+            "strategy": self.strategy,
+        }
+
+    @classmethod
+    def from_dict(cls, spec_dict: Dict[str, Any]) -> "BacktestSpec":
+        """
+        Create a spec from a dictionary.
+
+        Args:
+            spec_dict: Dictionary as returned by to_dict().
+        """
+        return cls(**spec_dict)
+
+    def to_json(self) -> str:
+        """Serialize the spec to a JSON string."""
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, spec_json: str) -> "BacktestSpec":
+        """
+        Create a spec from a JSON string.
+
+        Args:
+            spec_json: JSON string as returned by to_json().
+        """
+        return cls.from_dict(json.loads(spec_json))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BacktestSpec):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"BacktestSpec({args})"
+
+
+# NOTE: Sweeps run many specs over the same input data, so each process only
+# reads (and validates) an input file once.
+@lru_cache(maxsize=8)
+def _load_data(data_filepath: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load input data for a spec.
+
+    Args:
+        data_filepath: Filepath to excel input data.
+
+    Returns:
+        Tuple of prices dataframe and weights dataframe.
+    """
+    return data_collector(data_filepath, plot=False)
+
+
+def run_spec(
+    spec: BacktestSpec, data: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+) -> BacktestAnalysis:
+    """
+    Run a backtest from a spec and compute its statistics.
+
+    Args:
+        spec: Backtest specification.
+        data: Optional tuple of prices dataframe and weights dataframe. If not
+        given, the data is read from spec.data_filepath.
+
+    Returns:
+        BacktestAnalysis with statistics computed.
+    """
+    if data is None:
+        data = _load_data(spec.data_filepath)
+    prices_df, weights_df = data
+
+    # NOTE: Asset universe for future versions
+    # asset_universe = list(prices_df.columns)
+
+    # Initialise strategy
+    strategy = STRATEGIES[spec.strategy](weights_df=weights_df)
+
+    # Initialise portfolio
+    portfolio = Portfolio(
+        initial_capital=spec.initial_capital,
+        price_data_source=prices_df,
+        transaction_cost=spec.transaction_cost,
+    )
+    # Initialise backtest
+    backtest = Backtest(
+        strategy=strategy,
+        timestamps=prices_df.index.values,
+        portfolio=portfolio,
+        price_data_source=prices_df,
+    )
+    # Run backtest
+    backtest.run_backtest()
+
+    # Run analysis
+    analyser = BacktestAnalysis(
+        backtest=backtest, risk_free_rate=spec.risk_free_rate
+    )
+    analyser.compute_stats()
+
+    return analyser
@@ -1,7 +1,7 @@
 """Strategy Class"""
 
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Dict
 
 import pandas as pd
 
@@ -32,6 +32,38 @@ class Strategy(ABC):
         """
         pass
 
+    def add_weights(self, weights_df: pd.DataFrame) -> None:
+        """
+        Add weights for new timestamps (for extending a backtest).
+
+        Strategies keep their input weights in weights_df. Strategies which do
+        not should override this.
+
+        Args:
+            weights_df: Time-series dataframe of new weights for each asset.
+        """
+        self.weights_df = pd.concat([self.weights_df, weights_df])
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Return the internal state of the strategy (for checkpointing).
+
+        By convention, private attributes hold state built up during the
+        backtest and public attributes are inputs (e.g. weights_df).
+        Strategies which do not follow this should override get_state and
+        set_state.
+        """
+        return {k: v for k, v in self.__dict__.items() if k.startswith("_")}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the internal state returned by get_state.
+
+        Args:
+            state: Internal state of the strategy.
+        """
+        self.__dict__.update(state)
+
 
 class DummyStrategy(Strategy):
     """
@@ -105,8 +137,11 @@ class MomentumStrategy(Strategy):
         Returns:
             Portfolio weights.
         """
-        # Update historical prices
-        self._prices_record = pd.concat([self._prices_record, prices])
+        ts = pd.Timestamp(ts)
+        # Update historical prices (one row per timestamp)
+        self._prices_record = pd.concat(
+            [self._prices_record, prices.to_frame(ts).T]
+        )
 
         if ts in self.weights_df.index:
             # For the first two months, return the default weights.
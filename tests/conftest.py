@@ -0,0 +1,56 @@
+"""Shared fixtures. The package modules import each other by flat name."""
+
+import os
+import sys
+from typing import Callable, Optional, Type
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "strategybacktest"))
+
+from backtest import Backtest  # noqa: E402
+from costs import CostModel  # noqa: E402
+from functions import data_collector  # noqa: E402
+from portfolio import Portfolio  # noqa: E402
+from strategy import DummyStrategy, Strategy  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def data_filepath() -> str:
+    """Filepath of the example data."""
+    return os.path.join(ROOT, ".data", "Task.xlsx")
+
+
+@pytest.fixture(scope="session")
+def data(data_filepath: str) -> tuple:
+    """Prices and weights of the example data."""
+    return data_collector(data_filepath)
+
+
+@pytest.fixture
+def make_backtest() -> Callable[..., Backtest]:
+    """Return a factory of backtests over the given prices and weights."""
+
+    def make(
+        prices_df: pd.DataFrame,
+        weights_df: pd.DataFrame,
+        strategy_class: Type[Strategy] = DummyStrategy,
+        transaction_cost: float = 0.003,
+        cost_model: Optional[CostModel] = None,
+    ) -> Backtest:
+        portfolio = Portfolio(
+            initial_capital=1e6,
+            price_data_source=prices_df,
+            transaction_cost=transaction_cost,
+            cost_model=cost_model,
+        )
+        return Backtest(
+            strategy=strategy_class(weights_df),
+            timestamps=prices_df.index.values,
+            portfolio=portfolio,
+            price_data_source=prices_df,
+        )
+
+    return make
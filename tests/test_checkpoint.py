@@ -0,0 +1,75 @@
+"""Tests for checkpointing and resuming a backtest."""
+
+from typing import Type
+
+import pandas as pd
+import pytest
+from strategy import DummyStrategy, MomentumStrategy, Strategy
+
+
+class Crash(Exception):
+    """Simulated crash of a backtest."""
+
+
+def crashing_strategy(strategy_class: Type[Strategy], crash_at: int) -> type:
+    """Return a strategy_class which raises Crash on its crash_at-th call."""
+
+    class CrashingStrategy(strategy_class):
+        n_calls = 0
+
+        def __call__(self, ts, **kwargs):
+            CrashingStrategy.n_calls += 1
+            if CrashingStrategy.n_calls == crash_at:
+                raise Crash
+            return super().__call__(ts, **kwargs)
+
+    return CrashingStrategy
+
+
+@pytest.mark.parametrize("strategy_class", [DummyStrategy, MomentumStrategy])
+def test_resume_matches_uninterrupted_run(
+    data, make_backtest, tmp_path, strategy_class
+):
+    """A run resumed from a checkpoint matches an uninterrupted run."""
+    prices_df, weights_df = data
+    filepath = tmp_path / "backtest.ckpt"
+    reference = make_backtest(prices_df, weights_df, strategy_class)
+    reference.run_backtest()
+
+    crashed = make_backtest(
+        prices_df, weights_df, crashing_strategy(strategy_class, 131)
+    )
+    with pytest.raises(Crash):
+        crashed.run_backtest(checkpoint_filepath=filepath, checkpoint_every=100)
+
+    resumed = make_backtest(prices_df, weights_df, strategy_class)
+    resumed.load_checkpoint(filepath)
+    assert resumed._position == 100
+    resumed.run_backtest()
+
+    assert resumed.NAV_record == reference.NAV_record
+    assert resumed.portfolio.positions == reference.portfolio.positions
+    for ledger in ("trade_ledger", "holdings_ledger"):
+        assert (
+            getattr(resumed.portfolio, ledger)
+            .to_frame()
+            .equals(getattr(reference.portfolio, ledger).to_frame())
+        )
+    # Strategy state, e.g. MomentumStrategy._prices_record
+    reference_state = reference.strategy.get_state()
+    resumed_state = resumed.strategy.get_state()
+    assert resumed_state.keys() == reference_state.keys()
+    for name, value in reference_state.items():
+        if isinstance(value, pd.DataFrame):
+            assert resumed_state[name].equals(value)
+        else:
+            assert resumed_state[name] == value
+
+
+def test_checkpoint_every_must_be_positive(data, make_backtest, tmp_path):
+    """checkpoint_every < 1 is rejected up front."""
+    backtest = make_backtest(*data)
+    with pytest.raises(ValueError):
+        backtest.run_backtest(
+            checkpoint_filepath=tmp_path / "backtest.ckpt", checkpoint_every=0
+        )
@@ -0,0 +1,72 @@
+"""Tests for transaction cost models."""
+
+import numpy as np
+import pytest
+from backtest import BacktestAnalysis
+from costs import FixedBpsCost, SpreadImpactCost
+
+
+def final_NAV(backtest) -> float:
+    """Return the last NAV of a backtest."""
+    return list(backtest.NAV_record.values())[-1]
+
+
+def test_higher_costs_give_lower_NAV(data, make_backtest):
+    """Costs are paid from cash, so higher costs give a lower NAV."""
+    NAVs = []
+    for bps in (0, 30, 100):
+        backtest = make_backtest(*data, cost_model=FixedBpsCost(bps))
+        backtest.run_backtest()
+        NAVs.append(final_NAV(backtest))
+
+    assert NAVs[0] > NAVs[1] > NAVs[2]
+
+
+def test_flat_cost_matches_fixed_bps(data, make_backtest):
+    """A flat transaction cost is charged like the same FixedBpsCost."""
+    flat = make_backtest(*data, transaction_cost=0.003)
+    flat.run_backtest()
+    fixed = make_backtest(*data, cost_model=FixedBpsCost(30))
+    fixed.run_backtest()
+
+    assert final_NAV(flat) == pytest.approx(final_NAV(fixed))
+    np.testing.assert_allclose(
+        flat.portfolio.trade_ledger.column("cost"),
+        fixed.portfolio.trade_ledger.column("cost"),
+    )
+
+
+def test_cost_sensitivity_matches_rerun(data, make_backtest):
+    """The run's own scenario reproduces it and others approximate reruns."""
+    backtest = make_backtest(*data, cost_model=FixedBpsCost(30))
+    backtest.run_backtest()
+    analyser = BacktestAnalysis(backtest, risk_free_rate=0)
+    analyser.compute_stats()
+    sensitivity = analyser.cost_sensitivity(
+        {"30bps": FixedBpsCost(30), "10bps": FixedBpsCost(10)}
+    )
+
+    assert sensitivity.loc["30bps", "Total Return"] == pytest.approx(
+        analyser.summary_stats["Total Return"].iloc[0], abs=1e-12
+    )
+    rerun = make_backtest(*data, cost_model=FixedBpsCost(10))
+    rerun.run_backtest()
+    rerun_analyser = BacktestAnalysis(rerun, risk_free_rate=0)
+    rerun_analyser.compute_stats()
+    # First order: the trade list is held fixed.
+    assert sensitivity.loc["10bps", "Total Return"] == pytest.approx(
+        rerun_analyser.summary_stats["Total Return"].iloc[0], abs=5e-4
+    )
+
+
+def test_cost_model_summary(data, make_backtest):
+    """With a cost model, Transaction Cost is empty and the model is named."""
+    cost_model = SpreadImpactCost(10, volatility=0.02, adv=1e6)
+    backtest = make_backtest(*data, cost_model=cost_model)
+    backtest.run_backtest()
+    analyser = BacktestAnalysis(backtest, risk_free_rate=0)
+    analyser.compute_stats()
+    summary_stats = analyser.summary_stats
+
+    assert np.isnan(summary_stats["Transaction Cost"].iloc[0])
+    assert summary_stats["Cost Model"].iloc[0] == repr(cost_model)
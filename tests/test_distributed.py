@@ -0,0 +1,72 @@
+"""Tests for distributed backtest sweeps."""
+
+import pytest
+from distributed import SPEC_STATISTICS, LocalSweepBroker, local_sweep
+from spec import STRATEGIES, BacktestSpec, run_spec
+
+
+def test_local_sweep_matches_local_runs(data_filepath):
+    """Sweep results match running the specs locally."""
+    specs = [
+        BacktestSpec(1e6, risk_free_rate, 0.003, data_filepath=data_filepath)
+        for risk_free_rate in (0, 0.015)
+    ]
+    progress = []
+    summary_df, NAV_records = local_sweep(
+        specs, n_workers=2, progress=lambda *args: progress.append(args)
+    )
+
+    assert progress == [(1, 2), (2, 2)]
+    assert list(summary_df.index) == [0, 1]
+    spec_columns = list(specs[0].to_dict())
+    assert list(summary_df.columns[: len(spec_columns)]) == spec_columns
+    assert not set(SPEC_STATISTICS) & set(summary_df.columns)
+    for task_id, spec in enumerate(specs):
+        analyser = run_spec(spec)
+        assert list(NAV_records[task_id]) == list(
+            analyser.backtest.NAV_record.values()
+        )
+        assert summary_df.loc[task_id, "Sharpe Ratio"] == pytest.approx(
+            analyser.summary_stats["Sharpe Ratio"].iloc[0]
+        )
+
+
+class CountingBroker(LocalSweepBroker):
+    """LocalSweepBroker recording the tasks it retries."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.retried = []
+
+    def _retry(self, task_id, attempts, spec_json) -> bool:
+        retried = super()._retry(task_id, attempts, spec_json)
+        if retried:
+            self.retried.append(task_id)
+        return retried
+
+
+def test_failing_task_is_retried_then_reported(data_filepath, tmp_path):
+    """A failing task is retried max_retries times, then left out."""
+    specs = [
+        BacktestSpec(1e6, 0, 0.003, data_filepath=data_filepath),
+        BacktestSpec(1e6, 0, 0.003, data_filepath=str(tmp_path / "no.xlsx")),
+    ]
+    with CountingBroker(n_workers=2, max_retries=2) as broker:
+        with pytest.warns(UserWarning, match="1 of 2 backtests failed"):
+            summary_df, NAV_records = broker.run(specs)
+
+    assert broker.retried == [1, 1]
+    assert list(broker.failures) == [1]
+    assert "FileNotFoundError" in broker.failures[1]
+    assert list(summary_df.index) == [0]
+    assert list(NAV_records) == [0]
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_registered_strategies_run(data_filepath, strategy):
+    """Every strategy offered to specs runs on the example data."""
+    spec = BacktestSpec(
+        1e6, 0, 0.003, data_filepath=data_filepath, strategy=strategy
+    )
+    summary_stats = run_spec(spec).summary_stats
+    assert summary_stats["Total Return"].notna().all()
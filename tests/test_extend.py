@@ -0,0 +1,72 @@
+"""Tests for extending a finished backtest and updating its statistics."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import BacktestAnalysis
+
+
+def test_extend_and_update_match_full_run(data, make_backtest):
+    """extend() + update() give the same statistics as a full run."""
+    prices_df, weights_df = data
+    reference = make_backtest(prices_df, weights_df)
+    reference.run_backtest()
+    reference_analysis = BacktestAnalysis(reference, risk_free_rate=0.015)
+    reference_analysis.compute_stats()
+
+    cuts = [300, 320, len(prices_df)]
+    backtest = make_backtest(
+        prices_df.iloc[: cuts[0]],
+        weights_df[weights_df.index < prices_df.index[cuts[0]]],
+    )
+    backtest.run_backtest()
+    analysis = BacktestAnalysis(backtest, risk_free_rate=0.015)
+    analysis.compute_stats()
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        new_prices = prices_df.iloc[start:end]
+        new_weights = weights_df[
+            (weights_df.index >= new_prices.index[0])
+            & (weights_df.index <= new_prices.index[-1])
+        ]
+        backtest.extend(new_prices, new_weights)
+        analysis.update()
+
+    assert backtest.NAV_record == reference.NAV_record
+    pd.testing.assert_frame_equal(
+        analysis.stats, reference_analysis.stats, check_exact=False, rtol=1e-10
+    )
+    pd.testing.assert_frame_equal(
+        analysis.summary_stats,
+        reference_analysis.summary_stats,
+        check_exact=False,
+        rtol=1e-10,
+    )
+    np.testing.assert_allclose(
+        analysis._daily_drawdown, reference_analysis._daily_drawdown
+    )
+    np.testing.assert_allclose(
+        analysis._max_daily_drawdown, reference_analysis._max_daily_drawdown
+    )
+
+
+def test_extend_with_no_new_prices(data, make_backtest):
+    """Extending with no new rows keeps the NAV but adds the new weights."""
+    prices_df, weights_df = data
+    backtest = make_backtest(prices_df.iloc[:300], weights_df.iloc[:-1])
+    backtest.run_backtest()
+    NAV_record = dict(backtest.NAV_record)
+    backtest.extend(prices_df.iloc[:0], weights_df.iloc[-1:])
+
+    assert backtest.NAV_record == NAV_record
+    assert backtest.strategy.weights_df.equals(weights_df)
+
+
+def test_extend_rejects_unsorted_timestamps(data, make_backtest):
+    """New timestamps must be sorted and unique."""
+    prices_df, weights_df = data
+    backtest = make_backtest(prices_df.iloc[:300], weights_df)
+    backtest.run_backtest()
+    with pytest.raises(ValueError):
+        backtest.extend(prices_df.iloc[300:310].iloc[::-1])
+    with pytest.raises(ValueError):
+        backtest.extend(prices_df.iloc[[300, 300]])
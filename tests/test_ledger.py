@@ -0,0 +1,47 @@
+"""Tests for the trade and holdings ledgers."""
+
+import numpy as np
+import pytest
+from backtest import BacktestAnalysis
+from costs import FixedBpsCost
+from portfolio import Portfolio
+
+
+def test_ledger_cost_is_cash_paid(data):
+    """The cost recorded for each trade is the cash paid for it."""
+    prices_df, weights_df = data
+    portfolio = Portfolio(1e6, prices_df, cost_model=FixedBpsCost(30))
+    weights = weights_df.iloc[0].to_dict()
+    portfolio.rebalance(weights, prices_df.index[0])
+    cash = portfolio._cash
+    ts = prices_df.index[1]
+    portfolio.rebalance(weights_df.iloc[1].to_dict(), ts)
+
+    ledger = portfolio.trade_ledger.to_frame()
+    trades = ledger[ledger["timestamp"] == ts]
+    traded_value = trades["quantity"] * trades["price"]
+    np.testing.assert_allclose(trades["cost"], np.abs(traded_value) * 0.003)
+    assert portfolio._cash == pytest.approx(
+        cash - traded_value.sum() - trades["cost"].sum()
+    )
+
+
+def test_trading_stats_cost(data, make_backtest):
+    """Total transaction cost is the cost paid, and zero without costs."""
+    for transaction_cost in (0, 0.003):
+        backtest = make_backtest(*data, transaction_cost=transaction_cost)
+        backtest.run_backtest()
+        analyser = BacktestAnalysis(backtest, risk_free_rate=0)
+        _, trading_summary_stats = analyser.trading_stats()
+        total_cost = trading_summary_stats["Total Transaction Cost"].iloc[0]
+
+        ledger = backtest.portfolio.trade_ledger
+        assert total_cost == pytest.approx(ledger.column("cost").sum())
+        traded_value = np.abs(
+            ledger.column("quantity") * ledger.column("price")
+        )
+        # No cost for the initial positions
+        initial = ledger.column("timestamp") == ledger.column("timestamp")[0]
+        assert total_cost == pytest.approx(
+            traded_value[~initial].sum() * transaction_cost
+        )